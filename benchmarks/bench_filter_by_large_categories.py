@@ -0,0 +1,45 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Benchmark `filter_by_large_categories` against the value_counts/isin version."""
+
+import argparse
+import timeit
+
+import numpy as np
+import pandas as pd
+
+from pandas_utility import PandasUtilities
+
+
+def filter_by_large_categories_value_counts(df, column_name, count=3):
+    """The previous implementation, hashing the column twice."""
+    counts = df[column_name].value_counts()
+    _filtered = df[column_name].isin(counts.nlargest(count).index)
+    return df[_filtered]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=10 ** 6)
+    parser.add_argument("--categories", type=int, default=1000)
+    parser.add_argument("--count", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(1234)
+    labels = np.array(["category_{}".format(i) for i in range(args.categories)])
+    df = pd.DataFrame({"category": labels[rng.zipf(1.5, args.rows) % args.categories]})
+
+    for name, func in [
+        ("value_counts/isin", filter_by_large_categories_value_counts),
+        ("factorize/bincount", PandasUtilities.filter_by_large_categories),
+    ]:
+        timings = timeit.repeat(
+            lambda: func(df, "category", args.count), number=1, repeat=args.repeat
+        )
+        print("{:<20} best of {}: {:.4f}s".format(name, args.repeat, min(timings)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,338 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Time and memory-profile every public `PandasUtilities` method.
+
+Every method runs on synthetic frames of each requested size, in a tall (few
+columns) and a wide (many columns) shape. Results are written as JSON, pass a
+previous results file with `--compare` to print the change per benchmark.
+
+    python benchmarks/run_benchmarks.py --rows 1e3 1e5 1e7 --output results.json
+    python benchmarks/run_benchmarks.py --compare results.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from pandas_utility import PandasUtilities as utils
+from pandas_utility.__version__ import __version__
+
+SHAPES = {
+    # shape: (number of value columns, rows divisor)
+    "tall": (4, 1),
+    "wide": (400, 100),
+}
+
+SCHEMA = {
+    "id": "int",
+    "value": {"dtype": "float32", "nan": 0.1},
+    "category": {"dtype": "category", "cardinality": 1000},
+    "date": "datetime",
+    "name": "string",
+}
+
+# Methods that are not timed: network bound or no work to measure.
+EXCLUDED = ("show_version", "open_google_sheet", "open_google_sheets")
+
+
+def categorical_column(rows, rng, cardinality=1000):
+    """Zipf-skewed string categories."""
+    labels = np.array(["category_{}".format(i) for i in range(cardinality)], dtype=object)
+    return labels[(rng.zipf(1.3, rows) - 1) % cardinality]
+
+
+def datetime_column(rows, rng, distinct=10000):
+    """ISO formatted date strings, with `distinct` different values."""
+    dates = pd.date_range("2000-01-01", periods=distinct, freq="h")
+    return dates.strftime("%Y-%m-%d %H:%M:%S").to_numpy(dtype=object)[
+        rng.integers(0, distinct, rows)
+    ]
+
+
+class Context:
+    """Synthetic data of one size and shape, created lazily."""
+
+    def __init__(self, rows, shape, rng):
+        n_cols, divisor = SHAPES[shape]
+        self.rows = max(rows // divisor, 10)
+        self.cols = n_cols
+        self.rng = rng
+        self.tmp_dir = tempfile.mkdtemp(prefix="pandas_utility_bench")
+        self._csv_files = None
+        self._join_index = None
+        self._reference = None
+        self._sketch = None
+        self.df = utils.create_random_df(
+            self.rows, self.cols, ["value_{}".format(i) for i in range(self.cols)]
+        )
+        self.df.loc[self.rng.random(self.rows) < 0.1, "value_0"] = np.nan
+        self.df["category"] = categorical_column(self.rows, self.rng)
+        self.df["date"] = datetime_column(self.rows, self.rng)
+        self.df["key"] = np.sort(
+            self.rng.integers(0, max(self.rows // 100, 1), self.rows)
+        )
+
+    @property
+    def reference(self):
+        if self._reference is None:
+            categories = self.df["category"].unique()
+            self._reference = pd.DataFrame(
+                {"category": categories, "rank": np.arange(len(categories))}
+            )
+        return self._reference
+
+    @property
+    def join_index(self):
+        if self._join_index is None:
+            self._join_index = utils.build_join_index(self.reference, "category")
+        return self._join_index
+
+    @property
+    def sketch(self):
+        if self._sketch is None:
+            self._sketch, _ = utils.sketch_categories(self.df, "category")
+        return self._sketch
+
+    @property
+    def csv_files(self):
+        if self._csv_files is None:
+            self._csv_files = []
+            for i, chunk in enumerate(np.array_split(np.arange(self.rows), 4)):
+                path = os.path.join(self.tmp_dir, "{}.csv".format(i))
+                self.df.iloc[chunk].to_csv(path, index=False)
+                self._csv_files.append(path)
+        return self._csv_files
+
+    def close(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+
+def _build_column_index(ctx):
+    utils.build_column_index(ctx.df, "category")
+    utils.invalidate_column_index(ctx.df)
+
+
+def _null_profile(ctx):
+    utils.null_profile(ctx.df)
+    utils.invalidate_null_profile(ctx.df)
+
+
+CASES = {
+    "create_random_df": lambda ctx: utils.create_random_df(ctx.rows, ctx.cols),
+    "generate_random_df": lambda ctx: sum(
+        len(chunk)
+        for chunk in utils.generate_random_df(ctx.rows, SCHEMA, chunksize=100000, seed=1)
+    ),
+    "write_random_df": lambda ctx: utils.write_random_df(
+        os.path.join(ctx.tmp_dir, "random.csv"), ctx.rows, SCHEMA, seed=1
+    ),
+    "rename_cols": lambda ctx: utils.rename_cols(ctx.df, prefix="p_", suffix="_s"),
+    "reverse_row_order": lambda ctx: utils.reverse_row_order(ctx.df, reset_index=True),
+    "reverse_col_order": lambda ctx: utils.reverse_col_order(ctx.df),
+    "select_by_datatype": lambda ctx: utils.select_by_datatype(
+        ctx.df, include_datatype=["number"]
+    ),
+    "lazy": lambda ctx: utils.lazy(ctx.df)
+    .remove_rows_with_nan("value_0")
+    .filter_by_multiple_categories("category", ["category_0", "category_1"])
+    .select_by_datatype(include_datatype=["number"])
+    .rename_cols(prefix="p_")
+    .collect(),
+    "optimize_memory": lambda ctx: utils.optimize_memory(
+        ctx.df, date_format="%Y-%m-%d %H:%M:%S"
+    ),
+    "build_df_from_csvs": lambda ctx: utils.build_df_from_csvs(ctx.csv_files, axis=0),
+    "build_df_from_csvs_pushdown": lambda ctx: utils.build_df_from_csvs(
+        ctx.csv_files,
+        axis=0,
+        include_datatype=["number"],
+        filters=[("value_0", "notna"), ("category", "isin", ["category_0"])],
+    ),
+    "infer_csv_schema": lambda ctx: utils.infer_csv_schema(ctx.csv_files),
+    "stream_df_from_csvs": lambda ctx: sum(
+        len(chunk) for chunk in utils.stream_df_from_csvs(ctx.csv_files)
+    ),
+    "parallel_apply": lambda ctx: utils.parallel_apply(
+        ctx.df, "remove_rows_with_nan", "value_0", max_workers=2
+    ),
+    "split_df_into_subsets": lambda ctx: utils.split_df_into_subsets(ctx.df, 0.8),
+    "build_column_index": _build_column_index,
+    "build_join_index": lambda ctx: utils.build_join_index(ctx.reference, "category"),
+    "join_by_index": lambda ctx: utils.join_by_index(ctx.df, ctx.join_index),
+    "null_profile": _null_profile,
+    "invalidate_null_profile": lambda ctx: utils.invalidate_null_profile(ctx.df),
+    "invalidate_column_index": lambda ctx: utils.invalidate_column_index(ctx.df),
+    "filter_by_multiple_categories": lambda ctx: utils.filter_by_multiple_categories(
+        ctx.df, "category", filter_by=["category_{}".format(i) for i in range(0, 100, 7)]
+    ),
+    "filter_by_large_categories": lambda ctx: utils.filter_by_large_categories(
+        ctx.df, "category", count=10
+    ),
+    "filter_by_large_categories_sketch": lambda ctx: utils.filter_by_large_categories(
+        ctx.df, "category", count=10, sketch=ctx.sketch
+    ),
+    "sketch_categories": lambda ctx: utils.sketch_categories(
+        utils.stream_df_from_csvs(ctx.csv_files), "category"
+    ),
+    "hash_rows": lambda ctx: utils.hash_rows(ctx.df),
+    "drop_duplicate_rows": lambda ctx: utils.drop_duplicate_rows(
+        ctx.df, subset=["category", "date"]
+    ),
+    "drop_duplicate_rows_stream": lambda ctx: sum(
+        len(chunk)
+        for chunk in utils.drop_duplicate_rows(
+            utils.stream_df_from_csvs(ctx.csv_files), subset=["category", "date"]
+        )
+    ),
+    "drop_cols_with_NaNs": lambda ctx: utils.drop_cols_with_NaNs(ctx.df, 0.95),
+    "aggregate_by_functions": lambda ctx: utils.aggregate_by_functions(
+        ctx.df, "value_1", "key", ["sum", "count", "mean"]
+    ),
+    "continous_to_categorical_data": lambda ctx: utils.continous_to_categorical_data(
+        ctx.df, "value_1", bins=[0, 0.25, 0.5, 1], labels=["low", "medium", "high"]
+    ),
+    "fit_quantile_bins": lambda ctx: utils.fit_quantile_bins(ctx.df, "value_1", q=10),
+    "change_display_opt": lambda ctx: (
+        utils.change_display_opt(),
+        utils.change_display_opt(reset=True),
+    ),
+    "remove_rows_with_nan": lambda ctx: utils.remove_rows_with_nan(ctx.df, "value_0"),
+    "col_to_datetime": lambda ctx: utils.col_to_datetime(
+        ctx.df, "date", date_format="%Y-%m-%d %H:%M:%S"
+    ),
+    "binning_column_by_group_names": lambda ctx: utils.binning_column_by_group_names(
+        ctx.df, "value_1", 4
+    ),
+}
+
+
+def public_methods():
+    return sorted(
+        name
+        for name, value in vars(utils).items()
+        if isinstance(value, staticmethod) and not name.startswith("_")
+    )
+
+
+def run_case(func, ctx, repeat):
+    func(ctx)  # warm up, e.g. writes the csv files
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(ctx)
+        timings.append(time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        func(ctx)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        "best_s": min(timings),
+        "mean_s": sum(timings) / len(timings),
+        "peak_bytes": peak,
+    }
+
+
+def compare(baseline_file, results):
+    with open(baseline_file) as f:
+        baseline = {
+            (result["method"], result["shape"], result["rows"]): result
+            for result in json.load(f)["results"]
+        }
+    print(
+        "{:<32} {:<5} {:>10} {:>10} {:>10}".format(
+            "method", "shape", "rows", "before", "after"
+        )
+    )
+    for result in results:
+        before = baseline.get((result["method"], result["shape"], result["rows"]))
+        if before is None:
+            continue
+        print(
+            "{:<32} {:<5} {:>10} {:>9.4f}s {:>9.4f}s  x{:.2f}".format(
+                result["method"],
+                result["shape"],
+                result["rows"],
+                before["best_s"],
+                result["best_s"],
+                before["best_s"] / max(result["best_s"], 1e-9),
+            )
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--rows",
+        nargs="+",
+        type=lambda rows: int(float(rows)),
+        default=[10**3, 10**4, 10**5, 10**6],
+        help="Frame sizes, e.g. 1e3 1e6 1e8",
+    )
+    parser.add_argument(
+        "--shapes", nargs="+", choices=sorted(SHAPES), default=sorted(SHAPES)
+    )
+    parser.add_argument(
+        "--methods", nargs="+", choices=sorted(CASES), default=sorted(CASES)
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--compare", help="Results JSON file of a previous run")
+    args = parser.parse_args()
+
+    missing = set(public_methods()) - set(CASES) - set(EXCLUDED)
+    if missing:
+        print("No benchmark for: {}".format(", ".join(sorted(missing))), file=sys.stderr)
+
+    results = []
+    for rows in args.rows:
+        for shape in args.shapes:
+            ctx = Context(rows, shape, np.random.default_rng(args.seed))
+            try:
+                for method in args.methods:
+                    result = run_case(CASES[method], ctx, args.repeat)
+                    result.update(
+                        method=method, shape=shape, rows=ctx.rows, cols=ctx.df.shape[1]
+                    )
+                    results.append(result)
+                    print(
+                        "{:<32} {:<5} {:>10} {:>9.4f}s {:>12} B".format(
+                            method,
+                            shape,
+                            ctx.rows,
+                            result["best_s"],
+                            result["peak_bytes"],
+                        )
+                    )
+            finally:
+                ctx.close()
+
+    report = {
+        "pandas_utility": __version__,
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        compare(args.compare, results)
+
+
+if __name__ == "__main__":
+    main()
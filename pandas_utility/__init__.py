@@ -5,4 +5,20 @@
 __author__ = """Mpho Mphego"""
 __email__ = "mpho112@gmail.com"
 
-from pandas_utility.pandas_utility import PandasUtilities  # noqa:401
+from pandas_utility.pandas_utility import (  # noqa:401
+    AggregationState,
+    CategoryFilter,
+    ColumnIndex,
+    ColumnIndexCache,
+    CountMinSketch,
+    CsvCache,
+    DuplicateTracker,
+    HyperLogLog,
+    JoinIndex,
+    LazyFrame,
+    NullProfile,
+    NullProfileCache,
+    ROW_LOCAL_OPERATIONS,
+    PandasUtilities,
+    Profiler,
+)
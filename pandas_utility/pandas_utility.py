@@ -2,8 +2,2493 @@
 
 """Main module."""
 
+import bisect
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import shutil
+import tempfile
+import threading
+import time
+import tracemalloc
+import warnings
+import weakref
+from collections import Counter, OrderedDict, namedtuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager, suppress
+from functools import partial, wraps
+from io import BytesIO
+from multiprocessing import resource_tracker, shared_memory
+from urllib.error import HTTPError, URLError
+from urllib.request import Request, urlopen
+
 import numpy as np
 import pandas as pd
+from pandas.api.types import (
+    is_bool_dtype,
+    is_datetime64_any_dtype,
+    is_float_dtype,
+    is_integer_dtype,
+    is_numeric_dtype,
+    is_object_dtype,
+    is_string_dtype,
+)
+
+
+def _per_file(option, n_files):
+    """Expand a read option into one value per file.
+
+    A list or tuple with exactly one entry per file is treated as per-file hints,
+    anything else is shared by every file.
+    """
+    if isinstance(option, (list, tuple)) and len(option) == n_files:
+        if all(isinstance(opt, (dict, list, tuple, type(None))) for opt in option):
+            return list(option)
+    return [option] * n_files
+
+
+def _read_jobs(csv_files, **read_options):
+    """Pair every csv file with its own `pandas.read_csv` keyword arguments.
+
+    Options set to None are left out, the rest are expanded with `_per_file`.
+    """
+    csv_files = list(csv_files)
+    options = {
+        key: _per_file(value, len(csv_files))
+        for key, value in read_options.items()
+        if value is not None
+    }
+    jobs = []
+    for i, file in enumerate(csv_files):
+        file_options = {
+            key: value[i] for key, value in options.items() if value[i] is not None
+        }
+        dtype = file_options.get("dtype")
+        if isinstance(dtype, dict):
+            # read_csv cannot take datetime dtypes, those columns are parsed instead.
+            dates = [
+                col for col, _type in dtype.items() if is_datetime64_any_dtype(_type)
+            ]
+            if dates:
+                file_options["dtype"] = {
+                    col: _type for col, _type in dtype.items() if col not in dates
+                }
+                # Unlike dtype, parse_dates fails on columns the file does not have.
+                columns = pd.read_csv(file, nrows=0).columns
+                usecols = file_options.get("usecols")
+                if isinstance(usecols, (list, tuple, pd.Index)):
+                    columns = columns.intersection(usecols)
+                dates = [col for col in dates if col in columns]
+            if dates:
+                file_options["parse_dates"] = dates
+        jobs.append((file, file_options))
+    return jobs
+
+
+def _top_k(counts, k):
+    """Positions of the `k` largest counts, largest first.
+
+    Ties are broken by position so the selection is deterministic, and
+    `numpy.argpartition` keeps the work linear when there are many categories.
+    """
+    if k <= 0:
+        return np.array([], dtype=np.intp)
+    if k < len(counts):
+        kth = counts[np.argpartition(counts, len(counts) - k)[len(counts) - k]]
+        candidates = np.flatnonzero(counts >= kth)
+    else:
+        candidates = np.arange(len(counts))
+    order = np.lexsort((candidates, -counts[candidates]))
+    return candidates[order][:k]
+
+
+_SEGMENT_FUNCTIONS = ("sum", "count", "min", "max", "mean", "size")
+
+
+def _segment_reducible(df, column_name, group_by, functions):
+    """Whether `_segment_aggregate` supports this aggregation."""
+    if not isinstance(group_by, str) or not len(df):
+        return False
+    if isinstance(df[group_by].dtype, pd.CategoricalDtype):
+        return False
+    if df[group_by].hasnans:
+        # NaN != NaN would split the NaN keys into groups, groupby drops them.
+        return False
+    if not all(isinstance(func, str) for func in functions):
+        return False
+    if not set(functions) <= set(_SEGMENT_FUNCTIONS):
+        return False
+    column_names = [column_name] if isinstance(column_name, str) else column_name
+    return all(df[col].dtype in (np.int64, np.float64) for col in column_names)
+
+
+def _segment_aggregate(df, column_name, group_by, functions):
+    """Aggregate a frame sorted by `group_by`, every group being a contiguous run."""
+    keys = df[group_by].to_numpy()
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    sizes = np.diff(np.r_[starts, len(keys)])
+    index = pd.Index(df[group_by].iloc[starts])
+
+    column_names = [column_name] if isinstance(column_name, str) else column_name
+    results = {}
+    for col in column_names:
+        values = df[col].to_numpy()
+        notna = ~np.isnan(values) if values.dtype.kind == "f" else None
+        if notna is None:
+            counts, sums = sizes, np.add.reduceat(values, starts)
+        else:
+            counts = np.add.reduceat(notna.astype(np.int64), starts)
+            sums = np.add.reduceat(np.where(notna, values, 0), starts)
+        for func in functions:
+            if func == "size":
+                result = sizes
+            elif func == "count":
+                result = counts
+            elif func == "sum":
+                result = sums
+            elif func == "min":
+                result = np.fmin.reduceat(values, starts)
+            elif func == "max":
+                result = np.fmax.reduceat(values, starts)
+            else:
+                with np.errstate(invalid="ignore", divide="ignore"):
+                    result = sums / counts
+            results[func if isinstance(column_name, str) else (col, func)] = result
+    return pd.DataFrame(results, index=index)
+
+
+_ISO_FORMATS = {
+    "%Y-%m-%d": "YYYY-mm-dd",
+    "%Y-%m-%d %H:%M:%S": "YYYY-mm-dd HH:MM:SS",
+    "%Y-%m-%dT%H:%M:%S": "YYYY-mm-ddTHH:MM:SS",
+}
+
+
+def _parse_iso_datetimes(strings, date_format):
+    """Parse fixed-width ISO strings by slicing their bytes.
+
+    Returns datetime64[s] values and a mask of the strings that were parsed, the
+    others (wrong width, non-digits, invalid dates) are left to strptime.
+    """
+    layout = _ISO_FORMATS[date_format]
+    parsed = np.full(len(strings), np.datetime64("NaT"), dtype="datetime64[s]")
+    lengths = np.fromiter((len(string) for string in strings), np.intp, len(strings))
+    ok = lengths == len(layout)
+    try:
+        raw = np.asarray(strings[ok], dtype="S{}".format(len(layout)))
+    except UnicodeEncodeError:
+        return parsed, np.zeros(len(strings), dtype=bool)
+    chars = raw.view(np.uint8).reshape(-1, len(layout)).astype(np.int64)
+    digits = chars - ord("0")
+    valid = np.ones(len(raw), dtype=bool)
+    for i, char in enumerate(layout):
+        if char.isalpha():
+            valid &= (digits[:, i] >= 0) & (digits[:, i] <= 9)
+        else:
+            valid &= chars[:, i] == ord(char)
+
+    def field(first, width):
+        value = np.zeros(len(raw), dtype=np.int64)
+        for i in range(first, first + width):
+            value = value * 10 + digits[:, i]
+        return value
+
+    year, month, day = field(0, 4), field(5, 2), field(8, 2)
+    valid &= (month >= 1) & (month <= 12) & (day >= 1)
+    months = np.where(valid, (year - 1970) * 12 + month - 1, 0).astype("datetime64[M]")
+    days_in_month = ((months + 1).astype("datetime64[D]") - months).astype(np.int64)
+    valid &= day <= days_in_month
+    seconds = months.astype("datetime64[D]").astype("datetime64[s]") + (day - 1) * 86400
+    if len(layout) > 10:
+        hour, minute, second = field(11, 2), field(14, 2), field(17, 2)
+        valid &= (hour < 24) & (minute < 60) & (second < 60)
+        seconds = seconds + hour * 3600 + minute * 60 + second
+
+    positions = np.flatnonzero(ok)
+    parsed[positions[valid]] = seconds[valid]
+    ok[positions[~valid]] = False
+    return parsed, ok
+
+
+def _parse_datetimes(uniques, date_format, errors):
+    """Parse distinct values, using the ISO fast path where it applies."""
+    if date_format not in _ISO_FORMATS or pd.api.types.infer_dtype(uniques) != "string":
+        parsed = pd.to_datetime(uniques, format=date_format, errors=errors)
+        return pd.DatetimeIndex(parsed)
+    strings = np.asarray(uniques, dtype=object)
+    fast, ok = _parse_iso_datetimes(strings, date_format)
+    slow = pd.to_datetime(strings[~ok], format=date_format, errors=errors)
+    if ok.any():
+        # Match the resolution pandas would pick for this format.
+        sample = strings[np.argmax(ok)]
+        dtype = pd.to_datetime([sample], format=date_format).dtype
+    else:
+        dtype = slow.dtype
+    parsed = fast.astype(dtype)
+    parsed[~ok] = np.asarray(slow, dtype=dtype)
+    return pd.DatetimeIndex(parsed)
+
+
+# Below this many bins a binary search is cheaper than the arithmetic binning.
+_UNIFORM_MIN_BINS = 64
+
+
+def _bin_codes(values, edges, right=True, include_lowest=False, uniform=False):
+    """Bin code of every value, -1 for NaN's and values outside the edges.
+
+    Values are binned with `numpy.searchsorted`, many uniform bins are binned
+    arithmetically instead and corrected against the edges for rounding errors.
+    """
+    n_bins = len(edges) - 1
+    if uniform and n_bins > _UNIFORM_MIN_BINS:
+        width = (edges[-1] - edges[0]) / n_bins
+        with np.errstate(invalid="ignore"):
+            codes = np.floor((values - edges[0]) / width)
+            codes = np.clip(np.nan_to_num(codes), 0, n_bins - 1).astype(np.intp)
+            lower, upper = edges[codes], edges[codes + 1]
+            if right:
+                codes -= values <= lower
+                codes += values > upper
+            else:
+                codes -= values < lower
+                codes += values >= upper
+        codes[np.isnan(values)] = n_bins
+    else:
+        codes = np.searchsorted(edges, values, side="left" if right else "right") - 1
+    if include_lowest:
+        codes[values == edges[0]] = 0
+    codes[codes >= n_bins] = -1
+    return codes
+
+
+def _cut(col, bins, labels=None, right=True, include_lowest=False, uniform=False):
+    """`pandas.cut` on a numeric column with explicit edges, built from bin codes.
+
+    Other columns, e.g. datetimes, and bins that are not numbers go to `pandas.cut`.
+    """
+    try:
+        edges = np.asarray(bins, dtype=np.float64)
+    except (TypeError, ValueError):
+        edges = None
+    if edges is None or not is_numeric_dtype(col.dtype):
+        return pd.cut(
+            col, bins, labels=labels, right=right, include_lowest=include_lowest
+        )
+    if len(edges) < 2 or np.any(np.diff(edges) <= 0):
+        raise ValueError("bins must be at least two unique, increasing edges")
+    if len(labels if labels is not None else ()) == 0:
+        # Let pandas label the intervals, cutting just the bins is cheap. The
+        # original bins keep the interval subtype, e.g. int64 for int bins.
+        bins = np.asarray(bins)
+        categories = pd.cut(
+            bins, bins, right=right, include_lowest=include_lowest
+        ).categories
+    else:
+        if len(labels) != len(edges) - 1:
+            raise ValueError(
+                "Bin labels must be one fewer than the number of bin edges"
+            )
+        categories = labels
+    values = col.to_numpy(dtype=np.float64, na_value=np.nan)
+    codes = _bin_codes(values, edges, right, include_lowest, uniform)
+    return pd.Series(
+        pd.Categorical.from_codes(codes, categories=categories, ordered=True),
+        index=col.index,
+        name=col.name,
+    )
+
+
+def _column_kind(col, complete=True):
+    """Type of a sampled csv column: 'bool', 'int', 'float', 'datetime', 'string'
+    or 'empty' (no values). Floats holding only whole numbers (an int column with
+    NaN's) count as 'int' when the sample is the `complete` column, the rest of
+    the file could hold fractions.
+    """
+    values = col.dropna()
+    if values.empty:
+        return "empty"
+    if is_bool_dtype(col.dtype):
+        return "bool"
+    if is_integer_dtype(col.dtype):
+        return "int"
+    if is_float_dtype(col.dtype):
+        whole = complete and np.array_equal(values, np.floor(values))
+        return "int" if whole else "float"
+    if is_datetime64_any_dtype(col.dtype):
+        return "datetime"
+    if pd.api.types.infer_dtype(values, skipna=False) == "boolean":
+        return "bool"  # read_csv leaves booleans with NaN's as object
+    try:
+        parsed = pd.to_datetime(values, format="ISO8601", errors="coerce")
+    except (TypeError, ValueError):
+        parsed = None
+    return "datetime" if parsed is not None and parsed.notna().all() else "string"
+
+
+def _sample_csv(args):
+    """Head of a csv file, `args` is a (file, read_options, rows) tuple."""
+    file, read_options, rows = args
+    return pd.read_csv(file, nrows=rows, **read_options)
+
+
+def _unify_schema(samples, complete=None, category_threshold=0.5):
+    """Unified dtype of every column of the `samples` (one frame per file).
+
+    `complete` tells, per file, whether the sample is the whole file. Otherwise
+    NaN's may follow the sample, so ints and bools get the nullable dtypes.
+
+    Returns the dtypes and, per column, the sampled kind of every file, None
+    where a file lacks the column. Columns without a common type are left out,
+    or read as 'str' when one of the files holds text.
+    """
+    if complete is None:
+        complete = [True] * len(samples)
+    columns = pd.Index([]).append([sample.columns for sample in samples]).unique()
+    dtype, kinds = {}, {}
+    for column in columns:
+        cols = [sample[column] for sample in samples if column in sample.columns]
+        kinds[column] = [
+            _column_kind(sample[column], whole) if column in sample.columns else None
+            for sample, whole in zip(samples, complete)
+        ]
+        found = set(kinds[column]) - {None, "empty"}
+        # Rows of files without the column are NaN after concatenating.
+        has_nan = (
+            None in kinds[column]
+            or not all(complete)
+            or any(col.isna().any() for col in cols)
+        )
+        if found == {"bool"}:
+            dtype[column] = "boolean" if has_nan else "bool"
+        elif found == {"int"}:
+            dtype[column] = "Int64" if has_nan else "int64"
+        elif found == {"int", "float"} or found == {"float"}:
+            dtype[column] = "float64"
+        elif found == {"datetime"}:
+            dtype[column] = "datetime64[ns]"
+        elif found == {"string"}:
+            values = pd.concat(cols).dropna()
+            if values.nunique() / max(len(values), 1) <= category_threshold:
+                dtype[column] = "category"
+        elif "string" in found:
+            # Keep the text of every file rather than a mix of objects.
+            dtype[column] = "str"
+    return dtype, kinds
+
+
+def _union_categories(frames):
+    """Give the categorical columns of `frames` the union of their categories.
+
+    `pandas.concat` keeps a categorical column only when its categories are
+    identical in every frame, otherwise it falls back to object.
+    """
+    columns = set.intersection(
+        *(
+            {c for c in frame.columns if isinstance(frame[c].dtype, pd.CategoricalDtype)}
+            for frame in frames
+        )
+    )
+    for column in columns:
+        categories = pd.Index([]).append(
+            [frame[column].cat.categories for frame in frames]
+        ).unique()
+        for frame in frames:
+            if not frame[column].cat.categories.equals(categories):
+                frame[column] = frame[column].cat.set_categories(categories)
+    return frames
+
+
+def _with_filter_columns(read_options, filters):
+    """Add the filtered columns to `usecols`, returns (usecols, read_options)."""
+    usecols = read_options.get("usecols")
+    if usecols is None:
+        return None, read_options
+    extra = [column for column, *_ in filters if column not in usecols]
+    return usecols, dict(read_options, usecols=list(usecols) + extra)
+
+
+def _read_csv(args, cache=None, filters=None, chunksize=100000):
+    """Read a single csv file, `args` is a (file, read_options) tuple.
+
+    With row `filters` the file is parsed `chunksize` rows at a time and only the
+    matching rows of every chunk are kept. Columns read only for the filters are
+    dropped afterwards.
+    """
+    file, read_options = args
+    if not filters:
+        if cache is not None:
+            return cache.read_csv(file, **read_options)
+        return pd.read_csv(file, **read_options)
+
+    usecols, read_options = _with_filter_columns(read_options, filters)
+    if cache is not None:
+        pieces = [_filter_rows(cache.read_csv(file, **read_options), filters)]
+    else:
+        with pd.read_csv(file, chunksize=chunksize, **read_options) as reader:
+            pieces = [_filter_rows(chunk, filters) for chunk in reader]
+    if pieces:
+        df = pd.concat(pieces)
+    else:
+        df = pd.read_csv(file, nrows=0, **read_options)
+    if usecols is not None:
+        df = df.loc[:, df.columns.isin(usecols)]
+    return df
+
+
+def _read_all(read_csv, jobs, pool=None, max_workers=None):
+    """Read every (file, read_options) job, concurrently in `pool` if given."""
+    if pool is None:
+        return [read_csv(job) for job in jobs]
+    with pool(max_workers=max_workers) as executor:
+        # map() yields in submission order, so the output order is stable.
+        return list(executor.map(read_csv, jobs))
+
+
+def _select_columns(
+    jobs, include=None, exclude=None, sample_rows=1000, max_workers=None
+):
+    """Restrict every (file, read_options) job to the columns of the selected dtypes.
+
+    The dtypes are resolved on a sample of the head of every file.
+    """
+    tasks = [(file, options, sample_rows) for file, options in jobs]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        samples = list(executor.map(_sample_csv, tasks))
+    selected = []
+    for (file, options), sample in zip(jobs, samples):
+        columns = sample.select_dtypes(include=include or None, exclude=exclude or None)
+        options = dict(options, usecols=list(columns.columns))
+        if "parse_dates" in options:
+            options["parse_dates"] = [
+                column for column in options["parse_dates"] if column in columns
+            ]
+        selected.append((file, options))
+    return selected
+
+
+_COLUMN_DEFAULTS = {
+    "float64": {},
+    "float32": {},
+    "int": {"low": 0, "high": 1000},
+    "category": {"cardinality": 100, "zipf": 1.3},
+    "datetime": {"start": "2000-01-01", "end": "2030-01-01", "freq": "s"},
+    "string": {"length": 8},
+}
+
+
+def _column_specs(schema, nan_fraction=0.0):
+    """Normalise a schema to `{column: spec}`, where every spec is a full dict.
+
+    A column is given by its type name, e.g. 'category', or by a dict with a
+    'dtype' key plus the options of `_COLUMN_DEFAULTS` and 'nan'.
+    """
+    specs = {}
+    for name, spec in dict(schema).items():
+        spec = dict(spec) if isinstance(spec, dict) else {"dtype": spec}
+        dtype = spec.get("dtype", "float64")
+        if dtype not in _COLUMN_DEFAULTS:
+            raise ValueError(
+                "Column {!r} has unsupported dtype {!r}, expected one of {}".format(
+                    name, dtype, sorted(_COLUMN_DEFAULTS)
+                )
+            )
+        unknown = set(spec) - set(_COLUMN_DEFAULTS[dtype]) - {"dtype", "nan"}
+        if unknown:
+            raise ValueError("Unknown option(s) {} for column {!r}".format(unknown, name))
+        specs[name] = dict(_COLUMN_DEFAULTS[dtype], dtype=dtype, nan=nan_fraction)
+        specs[name].update(spec)
+        if not 0 <= specs[name]["nan"] <= 1:
+            raise ValueError(
+                "NaN fraction of column {!r} must be within [0, 1]".format(name)
+            )
+    return specs
+
+
+def _random_column(rng, spec, rows):
+    """Draw `rows` values of a single column spec from the generator `rng`."""
+    dtype = spec["dtype"]
+    missing = rng.random(rows) < spec["nan"] if spec["nan"] else None
+    if dtype in ("float64", "float32"):
+        values = rng.random(rows, dtype=np.dtype(dtype))
+        if missing is not None:
+            values[missing] = np.nan
+        return values
+    if dtype == "int":
+        values = rng.integers(spec["low"], spec["high"], rows)
+        if missing is None:
+            return values
+        return pd.arrays.IntegerArray(values, missing)
+    if dtype == "category":
+        cardinality = spec["cardinality"]
+        # Zipf ranks above the cardinality wrap around to keep the skew.
+        codes = ((rng.zipf(spec["zipf"], rows) - 1) % cardinality).astype(np.int32)
+        if missing is not None:
+            codes[missing] = -1
+        return pd.Categorical.from_codes(
+            codes, categories=["c{}".format(i) for i in range(cardinality)]
+        )
+    if dtype == "datetime":
+        unit = np.timedelta64(1, spec["freq"])
+        start = np.datetime64(spec["start"])
+        steps = (np.datetime64(spec["end"]) - start) // unit
+        values = start + rng.integers(0, steps, rows) * unit
+        if missing is not None:
+            values[missing] = np.datetime64("NaT")
+        return pd.to_datetime(values)
+    letters = rng.integers(ord("a"), ord("z") + 1, (rows, spec["length"]), dtype=np.uint8)
+    values = letters.view("S{}".format(spec["length"])).ravel().astype(str).astype(object)
+    if missing is not None:
+        values[missing] = None
+    return values
+
+
+def _random_chunk(args):
+    """Generate one chunk, `args` is a (specs, rows, offset, seed sequence) tuple."""
+    specs, rows, offset, seed = args
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {name: _random_column(rng, spec, rows) for name, spec in specs.items()},
+        index=pd.RangeIndex(offset, offset + rows),
+    )
+
+
+ROW_LOCAL_OPERATIONS = (
+    "filter_by_multiple_categories",
+    "remove_rows_with_nan",
+    "continous_to_categorical_data",
+    "col_to_datetime",
+)
+
+_SharedBlock = namedtuple("_SharedBlock", ["name", "dtype", "length"])
+
+
+def _attach_shared_memory(name):
+    """Attach to a block owned by the parent process.
+
+    The parent unlinks the block, so the worker must not register it with the
+    resource tracker or it would be unlinked twice.
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:  # Python < 3.13 has no `track`, skip the registration.
+        register = resource_tracker.register
+        resource_tracker.register = lambda *args, **kwargs: None
+        try:
+            return shared_memory.SharedMemory(name=name)
+        finally:
+            resource_tracker.register = register
+
+
+def _run_partition(task):
+    """Run a row-local operation on the rows `start:stop` of its column(s).
+
+    Filters return the row positions they keep, the other operations their
+    resulting Series, indexed by row position.
+    """
+    operation, column_name, block, start, stop, kwargs = task
+    if isinstance(block, pd.DataFrame):
+        return _apply_partition(operation, column_name, block, start, stop, kwargs)
+    if not isinstance(block, _SharedBlock):
+        return _apply_partition(operation, column_name, block.array, start, stop, kwargs)
+    shm = _attach_shared_memory(block.name)
+    try:
+        values = np.ndarray(block.length, dtype=block.dtype, buffer=shm.buf)
+        result = _apply_partition(
+            operation, column_name, values[start:stop], start, stop, kwargs
+        )
+        del values
+        return result
+    finally:
+        # Still exported when the operation raised, the error matters more.
+        with suppress(BufferError):
+            shm.close()
+
+
+def _apply_partition(operation, column_name, values, start, stop, kwargs):
+    index = pd.RangeIndex(start, stop)
+    if isinstance(values, pd.DataFrame):
+        frame = values.set_axis(index)
+    else:
+        frame = pd.DataFrame({column_name: values}, index=index)
+    result = getattr(PandasUtilities, operation)(frame, column_name, **kwargs)
+    if isinstance(result, pd.DataFrame):
+        return result.index.to_numpy()
+    if isinstance(result, tuple):
+        # A Series and a count, e.g. `col_to_datetime(report=True)`.
+        result, count = result
+        return result.copy(), count
+    # Detach the result from the (shared) input buffer.
+    return result.copy()
+
+
+def _global_bins(col, kwargs):
+    """Replace a number of equal-width bins by the edges over the whole `col`.
+
+    Every partition would otherwise span its bins over its own range.
+    """
+    bins = kwargs.get("bins", [])
+    if np.ndim(bins) or isinstance(bins, pd.IntervalIndex):
+        return kwargs
+    # pandas derives the edges from the min and max only.
+    _, edges = pd.cut(
+        pd.Series([col.min(), col.max()]),
+        bins,
+        include_lowest=kwargs.get("include_lowest", False),
+        retbins=True,
+    )
+    return dict(kwargs, bins=edges)
+
+
+def _fetch(url, headers=None, timeout=30, retries=2):
+    """GET `url`, retrying connection errors and server errors with a backoff.
+
+    Returns the HTTP status, body and headers, a 304 (Not Modified) response has
+    no body.
+    """
+    request = Request(url, headers=headers or {})
+    for attempt in range(retries + 1):
+        try:
+            with urlopen(request, timeout=timeout) as response:
+                return response.status, response.read(), response.headers
+        except HTTPError as error:
+            if error.code == 304:
+                return 304, b"", error.headers
+            if error.code < 500 or attempt == retries:
+                raise
+        except (URLError, OSError):
+            if attempt == retries:
+                raise
+        time.sleep(0.5 * 2 ** attempt)
+
+
+def _download(url, path, meta_path, timeout=30, retries=2):
+    """Download `url` to `path` unless the copy at `path` is still current.
+
+    The ETag and Last-Modified validators are kept in `meta_path`, with the
+    `url` as source, and sent back as a conditional request, an unchanged file
+    is left untouched.
+    """
+    headers = {}
+    if os.path.exists(path) and os.path.exists(meta_path):
+        with open(meta_path) as f:
+            validators = json.load(f)
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
+    status, body, response_headers = _fetch(url, headers, timeout, retries)
+    if status == 304:
+        return False
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        f.write(body)
+    os.replace(tmp_path, path)
+    with open(meta_path, "w") as f:
+        json.dump(
+            {
+                "source": url,
+                "etag": response_headers.get("ETag"),
+                "last_modified": response_headers.get("Last-Modified"),
+            },
+            f,
+        )
+    return True
+
+
+# Cache entries being read or downloaded in this process, kept from eviction.
+_BUSY_ENTRIES = Counter()
+_BUSY_LOCK = threading.Lock()
+
+
+@contextmanager
+def _busy(entry):
+    with _BUSY_LOCK:
+        _BUSY_ENTRIES[entry] += 1
+    try:
+        yield entry
+    finally:
+        with _BUSY_LOCK:
+            _BUSY_ENTRIES[entry] -= 1
+            if not _BUSY_ENTRIES[entry]:
+                del _BUSY_ENTRIES[entry]
+
+
+class CsvCache:
+
+    """On-disk columnar cache of parsed csv files
+
+    Parsed frames are stored column by column: numeric and datetime columns as
+    `.npy` files that are memory-mapped (copy-on-write) on load, the other
+    columns and the index pickled. Entries are keyed on the file path, its
+    modification time and size, and the read options, so a changed file is
+    parsed again. Remote files (URLs) are keyed on the URL and read options and
+    are served from the cache until invalidated, or downloaded into the cache
+    and revalidated on every read with `read_url`. Downloads count towards
+    `max_bytes` and are invalidated like the parsed entries.
+
+    Parameters
+    ----------
+    cache_dir : str
+        Directory holding the cache
+    max_bytes : int, optional
+        Upper bound on the size of the cache, least recently used entries are
+        evicted first.
+    """
+
+    def __init__(self, cache_dir, max_bytes=None):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def _source(path):
+        return path if "://" in str(path) else os.path.abspath(path)
+
+    def _key(self, path, read_options):
+        source = self._source(path)
+        parts = [source, sorted(read_options.items())]
+        if "://" not in source:
+            stat = os.stat(source)
+            parts += [stat.st_mtime_ns, stat.st_size]
+        return hashlib.sha1(repr(parts).encode()).hexdigest()
+
+    def _entries(self):
+        for name in os.listdir(self.cache_dir):
+            entry = os.path.join(self.cache_dir, name)
+            if os.path.isfile(os.path.join(entry, "meta.json")):
+                yield entry
+
+    @staticmethod
+    def _size(entry):
+        # Entries can be evicted by concurrent readers while being sized.
+        size = 0
+        with suppress(OSError):
+            for name in os.listdir(entry):
+                with suppress(OSError):
+                    size += os.path.getsize(os.path.join(entry, name))
+        return size
+
+    @staticmethod
+    def _last_used(entry):
+        try:
+            return os.path.getmtime(os.path.join(entry, "meta.json"))
+        except OSError:
+            return 0.0
+
+    @property
+    def nbytes(self):
+        return sum(self._size(entry) for entry in self._entries())
+
+    def read_csv(self, path, **read_options):
+        """`pandas.read_csv`, served from the cache when possible.
+
+        Parameters
+        ----------
+        path : str
+            Path or URL of the csv file
+        **read_options
+            Keyword arguments of `pandas.read_csv`
+
+        Returns
+        -------
+        `pandas.core.frame.DataFrame`
+            DataFrame
+        """
+        entry = os.path.join(self.cache_dir, self._key(path, read_options))
+        with _busy(entry):
+            if os.path.isfile(os.path.join(entry, "meta.json")):
+                os.utime(os.path.join(entry, "meta.json"))
+                return self._load(entry)
+        df = pd.read_csv(path, **read_options)
+        self._store(entry, df, self._source(path))
+        self._evict()
+        return df
+
+    def read_url(self, url, timeout=30, retries=2, **read_options):
+        """`pandas.read_csv` of a download kept in the cache.
+
+        The download is revalidated with a conditional (ETag/Last-Modified)
+        request, an unchanged file is neither downloaded nor parsed again.
+
+        Parameters
+        ----------
+        url : str
+            URL of the csv file
+        timeout : float, optional
+            Timeout of a request in seconds
+        retries : int, optional
+            Number of retries on connection errors and server errors.
+        **read_options
+            Keyword arguments of `pandas.read_csv`
+
+        Returns
+        -------
+        `pandas.core.frame.DataFrame`
+            DataFrame
+        """
+        entry = self._download_entry(url)
+        path = os.path.join(entry, "data.csv")
+        with _busy(entry):
+            os.makedirs(entry, exist_ok=True)
+            _download(url, path, os.path.join(entry, "meta.json"), timeout, retries)
+            os.utime(os.path.join(entry, "meta.json"))
+            df = self.read_csv(path, **read_options)
+        self._evict()
+        return df
+
+    def _download_entry(self, url):
+        return os.path.join(self.cache_dir, hashlib.sha1(url.encode()).hexdigest())
+
+    def _store(self, entry, df, source):
+        tmp_dir = tempfile.mkdtemp(dir=self.cache_dir, prefix=".tmp")
+        try:
+            memmapped, others = [], []
+            for i, (_, col) in enumerate(df.items()):
+                if isinstance(col.dtype, np.dtype) and col.dtype.kind in "biufmM":
+                    np.save(os.path.join(tmp_dir, "{}.npy".format(i)), col.to_numpy())
+                    memmapped.append(i)
+                else:
+                    others.append(i)
+            rest = df.iloc[:, others]
+            with open(os.path.join(tmp_dir, "frame.pkl"), "wb") as f:
+                pickle.dump((df.columns, rest), f, protocol=pickle.HIGHEST_PROTOCOL)
+            with open(os.path.join(tmp_dir, "meta.json"), "w") as f:
+                json.dump({"source": source, "memmapped": memmapped}, f)
+            os.replace(tmp_dir, entry)
+        except OSError:
+            # Another reader stored the same entry first.
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    @staticmethod
+    def _load(entry):
+        with open(os.path.join(entry, "meta.json")) as f:
+            memmapped = set(json.load(f)["memmapped"])
+        with open(os.path.join(entry, "frame.pkl"), "rb") as f:
+            columns, rest = pickle.load(f)
+        rest_columns = iter(range(rest.shape[1]))
+        data = {}
+        for i in range(len(columns)):
+            if i in memmapped:
+                path = os.path.join(entry, "{}.npy".format(i))
+                data[i] = np.asarray(np.load(path, mmap_mode="c"))
+            else:
+                data[i] = rest.iloc[:, next(rest_columns)].array
+        df = pd.DataFrame(data, index=rest.index, copy=False)
+        df.columns = columns
+        return df
+
+    def _evict(self):
+        if self.max_bytes is None:
+            return
+        entries = sorted(self._entries(), key=self._last_used)
+        total = sum(self._size(entry) for entry in entries)
+        for entry in entries:
+            if total <= self.max_bytes:
+                break
+            with _BUSY_LOCK:
+                if entry in _BUSY_ENTRIES:
+                    continue
+            total -= self._size(entry)
+            shutil.rmtree(entry, ignore_errors=True)
+
+    def invalidate(self, path=None):
+        """Drop the entries of `path`, or the whole cache.
+
+        Parameters
+        ----------
+        path : str, optional
+            Path or URL of the csv file
+        """
+        sources = None
+        if path is not None:
+            sources = {self._source(path)}
+            if "://" in str(path):
+                # The download of a URL and its parsed entries.
+                download = os.path.join(self._download_entry(path), "data.csv")
+                sources.add(self._source(download))
+        for entry in list(self._entries()):
+            if sources is not None:
+                with open(os.path.join(entry, "meta.json")) as f:
+                    if json.load(f)["source"] not in sources:
+                        continue
+            shutil.rmtree(entry, ignore_errors=True)
+
+
+class CategoryFilter:
+
+    """Prebuilt lookup of categories for `filter_by_multiple_categories`
+
+    Building the lookup once and passing it instead of a list avoids rebuilding a
+    hash table from the list on every call. Numeric categories are kept as a
+    sorted array and matched with `numpy.searchsorted`, other categories use the
+    (cached) hash engine of a `pandas.Index`. Categorical columns are matched on
+    their integer codes. Matches are those of `Series.isin`, which equates True
+    with 1 and False with 0, such bool and number mixes are left to it.
+
+    Parameters
+    ----------
+    categories : list
+        Categories to match
+    """
+
+    def __init__(self, categories):
+        self.categories = pd.Index(pd.unique(np.asarray(list(categories), dtype=object)))
+        self.categories = self.categories.infer_objects()
+        self._bools = is_bool_dtype(self.categories.dtype) or any(
+            isinstance(category, (bool, np.bool_)) for category in self.categories
+        )
+        self._sorted = None
+        if (
+            is_numeric_dtype(self.categories.dtype)
+            and not is_bool_dtype(self.categories.dtype)
+            and not self.categories.hasnans
+        ):
+            self._sorted = np.sort(self.categories.to_numpy())
+        self._categorical_cache = (None, None)
+
+    def __len__(self):
+        return len(self.categories)
+
+    def _lookup(self, values):
+        if (
+            self._bools
+            or is_bool_dtype(values.dtype)
+            or (is_object_dtype(values.dtype) and is_numeric_dtype(self.categories))
+        ):
+            return np.asarray(pd.Series(values).isin(list(self.categories)))
+        if (
+            self._sorted is not None
+            and is_numeric_dtype(values.dtype)
+            and not is_bool_dtype(values.dtype)
+        ):
+            values = np.asarray(values)
+            if not len(self._sorted):
+                return np.zeros(len(values), dtype=bool)
+            positions = np.searchsorted(self._sorted, values)
+            positions[positions == len(self._sorted)] = len(self._sorted) - 1
+            return self._sorted[positions] == values
+        return self.categories.get_indexer(values) != -1
+
+    def mask(self, series):
+        """Boolean mask of the rows of `series` holding one of the categories.
+
+        Parameters
+        ----------
+        series : pandas.Series
+            Column to match
+
+        Returns
+        -------
+        numpy.ndarray
+            Boolean mask
+        """
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            categories, keep = self._categorical_cache
+            if categories is not series.cat.categories:
+                # One extra False slot so that NaN's (code -1) never match.
+                keep = np.append(self._lookup(series.cat.categories), False)
+                self._categorical_cache = (series.cat.categories, keep)
+            return keep[series.cat.codes.to_numpy()]
+        return self._lookup(series)
+
+
+class ColumnIndex:
+
+    """Row positions of every category of a column, plus a NaN bitmap
+
+    Built once for a static DataFrame, a lookup then costs O(matching rows)
+    instead of a scan over the whole column.
+
+    Parameters
+    ----------
+    series : pandas.Series
+        Column to index
+    """
+
+    def __init__(self, series):
+        codes, uniques = pd.factorize(series)
+        if isinstance(uniques, pd.CategoricalIndex):
+            uniques = pd.Index(uniques.to_numpy())
+        self.categories = pd.Index(uniques)
+        self.n_rows = len(series)
+        # Positions grouped by code, the NaN's (code -1) come first.
+        self._positions = np.argsort(codes, kind="stable")
+        self._bounds = np.cumsum(np.bincount(codes + 1, minlength=len(uniques) + 1))
+        self.nan_bitmap = np.packbits(codes == -1)
+
+    @property
+    def nbytes(self):
+        return (
+            self._positions.nbytes
+            + self._bounds.nbytes
+            + self.nan_bitmap.nbytes
+            + self.categories.memory_usage(deep=True)
+        )
+
+    def nan_mask(self):
+        """Boolean mask of the rows holding NaN's."""
+        return np.unpackbits(self.nan_bitmap, count=self.n_rows).astype(bool)
+
+    def positions(self, categories):
+        """Sorted row positions holding one of `categories`.
+
+        Parameters
+        ----------
+        categories : list or CategoryFilter
+            Categories to look up
+
+        Returns
+        -------
+        numpy.ndarray
+            Row positions
+        """
+        if isinstance(categories, CategoryFilter):
+            categories = categories.categories
+        categories = pd.Index(categories)
+        codes = self.categories.get_indexer(categories.dropna().unique())
+        codes = codes[codes >= 0] + 1
+        if categories.hasnans:
+            codes = np.append(codes, 0)
+        starts = np.where(codes > 0, self._bounds[codes - 1], 0)
+        slices = [
+            self._positions[start:stop]
+            for start, stop in zip(starts, self._bounds[codes])
+        ]
+        if not slices:
+            return np.array([], dtype=np.intp)
+        return np.sort(np.concatenate(slices))
+
+
+class _FrameCache:
+
+    """LRU registry of objects derived from a DataFrame, keyed on (DataFrame, key)
+
+    Entries hold a weak reference to their DataFrame and are dropped once it is
+    garbage collected, or when `_valid` says they no longer match it.
+    """
+
+    def __init__(self, max_bytes=256 * 1024 ** 2):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def nbytes(self):
+        # A copy, entries of collected DataFrames can be dropped at any time.
+        return sum(value.nbytes for _, value in list(self._entries.values()))
+
+    def _valid(self, value, df):
+        return True
+
+    def _drop(self, key, ref):
+        """Weak reference callback, drops the entry of a collected DataFrame."""
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] is ref:
+            self._entries.pop(key, None)
+
+    def _put(self, df, key, value):
+        key = (id(df), key)
+        self._entries[key] = (weakref.ref(df, partial(self._drop, key)), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > 1 and self.nbytes > self.max_bytes:
+            self._entries.popitem(last=False)
+        return value
+
+    def _get(self, df, key):
+        key = (id(df), key)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        ref, value = entry
+        if ref() is not df or not self._valid(value, df):
+            self._entries.pop(key, None)
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def _invalidate(self, df=None, key=None, match_key=False):
+        for entry_key in list(self._entries):
+            if (df is None or entry_key[0] == id(df)) and (
+                not match_key or entry_key[1] == key
+            ):
+                self._entries.pop(entry_key, None)
+
+
+class ColumnIndexCache(_FrameCache):
+
+    """LRU registry of `ColumnIndex` objects keyed on (DataFrame, column)
+
+    Entries hold a weak reference to their DataFrame and are dropped once it is
+    garbage collected. A DataFrame that is modified in place must be invalidated
+    explicitly.
+
+    Parameters
+    ----------
+    max_bytes : int, optional
+        Upper bound on the memory held by the indexes, least recently used
+        indexes are evicted first.
+    """
+
+    def _valid(self, index, df):
+        return index.n_rows == len(df)
+
+    def build(self, df, column_name):
+        """Index `column_name` of `df` and register the index."""
+        return self._put(df, column_name, ColumnIndex(df[column_name]))
+
+    def get(self, df, column_name):
+        """The registered index of `column_name` of `df`, or None."""
+        return self._get(df, column_name)
+
+    def invalidate(self, df=None, column_name=None):
+        """Drop the indexes of `df` and/or `column_name`, or all of them."""
+        self._invalidate(df, column_name, match_key=column_name is not None)
+
+
+def _null_rows(counts, n_columns, how="any", min_count=None):
+    """Rows with nulls, given the number of null `counts` per row out of `n_columns`."""
+    if min_count is not None:
+        return counts >= min_count
+    if how == "any":
+        return counts > 0
+    if how == "all":
+        return counts == n_columns
+    raise ValueError("how must be 'any' or 'all', got {!r}".format(how))
+
+
+class NullProfile:
+
+    """Null counts per column and a packed row-by-column null bitmap
+
+    Computed in a single pass over `df`, `block_rows` rows at a time, so the
+    column-drop, row-drop and report questions do not scan the frame again. The
+    bitmap takes one bit per cell, packed along the columns of every row.
+
+    Parameters
+    ----------
+    df : pandas.core.frame.DataFrame
+        Two-dimensional size-mutable,
+        potentially heterogeneous tabular data
+    block_rows : int, optional
+        Rows per block, by default about 16M cells per block.
+    """
+
+    def __init__(self, df, block_rows=None):
+        n_rows, n_columns = df.shape
+        self.columns = df.columns
+        self.n_rows = n_rows
+        self.null_counts = np.zeros(n_columns, dtype=np.int64)
+        self.bitmap = np.zeros((n_rows, (n_columns + 7) // 8), dtype=np.uint8)
+        block_rows = block_rows or max(2 ** 24 // max(n_columns, 1), 1)
+        for start in range(0, n_rows, block_rows):
+            rows = slice(start, start + block_rows)
+            block = df.iloc[rows].isna().to_numpy(dtype=bool)
+            self.null_counts += block.sum(axis=0)
+            self.bitmap[rows] = np.packbits(block, axis=1)
+
+    @property
+    def nbytes(self):
+        return self.bitmap.nbytes + self.null_counts.nbytes
+
+    def _positions(self, columns=None):
+        if columns is None:
+            return np.arange(len(self.columns))
+        if not pd.api.types.is_list_like(columns) or isinstance(columns, tuple):
+            columns = [columns]
+        positions = self.columns.get_indexer(columns)
+        if (positions < 0).any():
+            raise KeyError([c for c, p in zip(columns, positions) if p < 0])
+        return positions
+
+    def row_null_counts(self, columns=None):
+        """Number of nulls of every row, in `columns` or all columns.
+
+        Returns
+        -------
+        numpy.ndarray
+            Null count per row
+        """
+        counts = np.zeros(self.n_rows, dtype=np.int64)
+        for position in self._positions(columns):
+            byte = self.bitmap[:, position >> 3]
+            counts += (byte >> (7 - (position & 7))) & 1
+        return counts
+
+    def null_rows(self, columns=None, how="any", min_count=None):
+        """Boolean mask of the rows with nulls in `columns`.
+
+        Parameters
+        ----------
+        columns : label or list, optional
+            Columns to check, all columns by default.
+        how : str, optional
+            'any' for rows with at least one null, 'all' for rows of nulls only.
+        min_count : int, optional
+            Rows with at least `min_count` nulls, overrides `how`.
+
+        Returns
+        -------
+        numpy.ndarray
+            Boolean mask
+        """
+        positions = self._positions(columns)
+        return _null_rows(self.row_null_counts(columns), len(positions), how, min_count)
+
+    def sparse_columns(self, threshold=0.1):
+        """Boolean mask of the columns with less than `threshold` non-null values.
+
+        Returns
+        -------
+        numpy.ndarray
+            Boolean mask over `columns`
+        """
+        return self.n_rows - self.null_counts < self.n_rows * threshold
+
+    def report(self):
+        """Null count and fraction of every column.
+
+        Returns
+        -------
+        `pandas.core.frame.DataFrame`
+            Columns 'null_count' and 'null_fraction', indexed by column.
+        """
+        return pd.DataFrame(
+            {
+                "null_count": self.null_counts,
+                "null_fraction": self.null_counts / max(self.n_rows, 1),
+            },
+            index=self.columns,
+        )
+
+
+class NullProfileCache(_FrameCache):
+
+    """LRU registry of `NullProfile` objects keyed on their DataFrame
+
+    Entries hold a weak reference to their DataFrame and are dropped once it is
+    garbage collected. A DataFrame that is modified in place must be invalidated
+    explicitly.
+
+    Parameters
+    ----------
+    max_bytes : int, optional
+        Upper bound on the memory held by the profiles, least recently used
+        profiles are evicted first.
+    """
+
+    def _valid(self, profile, df):
+        return profile.n_rows == len(df) and profile.columns.equals(df.columns)
+
+    def build(self, df, block_rows=None):
+        """Profile `df` and register the profile."""
+        return self._put(df, None, NullProfile(df, block_rows))
+
+    def get(self, df):
+        """The registered profile of `df`, or None."""
+        return self._get(df, None)
+
+    def invalidate(self, df=None):
+        """Drop the profile of `df`, or all of them."""
+        self._invalidate(df)
+
+
+class JoinIndex:
+
+    """Reusable many-to-one lookup index on the key column(s) of a reference table
+
+    The keys are indexed once, every join then looks up the row positions of the
+    fact keys and takes the reference columns at those positions, instead of a
+    full `pandas.merge` per fact frame.
+
+    Parameters
+    ----------
+    reference : pandas.core.frame.DataFrame
+        Reference (dimension) table with unique keys.
+    on : str or list
+        Key column(s) of `reference`.
+    columns : list, optional
+        Reference columns to join, all non-key columns by default.
+    method : str, optional
+        'hash' looks keys up in a hash table (a `pandas.Index`). 'sorted' keeps
+        the keys sorted and looks them up with `numpy.searchsorted`, it needs a
+        single numeric or datetime key without NaN's and holds no hash table,
+        but is slower on random lookups.
+
+    Raises
+    ------
+    ValueError
+        If the keys of `reference` are not unique, or on an unknown `method`.
+    """
+
+    def __init__(self, reference, on, columns=None, method="hash"):
+        self.on = on
+        keys_list = list(on) if isinstance(on, list) else [on]
+        if columns is None:
+            columns = [c for c in reference.columns if c not in keys_list]
+        self.columns = list(columns)
+        self.method = method
+        if isinstance(on, list):
+            keys = pd.MultiIndex.from_frame(reference[on])
+        else:
+            keys = pd.Index(reference[on])
+        if not keys.is_unique:
+            raise ValueError(
+                "Join keys {!r} are not unique, {} duplicated key(s)".format(
+                    on, keys.duplicated().sum()
+                )
+            )
+        if method == "hash":
+            self._keys = keys
+        elif method == "sorted":
+            values = keys.to_numpy() if not isinstance(on, list) else None
+            if values is None or values.dtype.kind not in "iufmM" or keys.hasnans:
+                raise ValueError(
+                    "method='sorted' needs a single numeric key without NaN's"
+                )
+            self._order = np.argsort(values, kind="stable")
+            self._keys = values[self._order]
+        else:
+            raise ValueError("method must be 'hash' or 'sorted', got {!r}".format(method))
+        self._values = {
+            column: reference[column].to_numpy()
+            if isinstance(reference[column].dtype, np.dtype)
+            else reference[column].array
+            for column in self.columns
+        }
+
+    def __len__(self):
+        return len(self._keys)
+
+    def positions(self, df, on=None):
+        """Row positions in the reference table of the keys of `df`, -1 if missing.
+
+        Parameters
+        ----------
+        df : pandas.core.frame.DataFrame
+            Fact frame
+        on : str or list, optional
+            Key column(s) of `df`, the reference key names by default.
+
+        Returns
+        -------
+        numpy.ndarray
+            Row positions
+        """
+        on = self.on if on is None else on
+        if self.method == "hash":
+            if isinstance(on, list):
+                return self._keys.get_indexer(pd.MultiIndex.from_frame(df[on]))
+            return self._keys.get_indexer(df[on])
+        if not len(self._keys):
+            return np.full(len(df), -1, dtype=np.intp)
+        values = df[on].to_numpy()
+        found = np.searchsorted(self._keys, values)
+        np.minimum(found, len(self._keys) - 1, out=found)
+        return np.where(self._keys[found] == values, self._order[found], -1)
+
+    def join(self, df, on=None, how="left", suffixes=("_x", "_y")):
+        """Add the reference columns to the rows of `df`.
+
+        Parameters
+        ----------
+        df : pandas.core.frame.DataFrame
+            Fact frame
+        on : str or list, optional
+            Key column(s) of `df`, the reference key names by default.
+        how : str, optional
+            'left' keeps every row of `df`, with NaN's where the key is missing
+            from the reference table, 'inner' only the rows with a match.
+        suffixes : tuple, optional
+            Appended to the fact and reference names of overlapping columns.
+
+        Returns
+        -------
+        `pandas.core.frame.DataFrame`
+            `df` in its original order and index, plus the reference columns.
+        """
+        if how not in ("left", "inner"):
+            raise ValueError("how must be 'left' or 'inner', got {!r}".format(how))
+        positions = self.positions(df, on)
+        if how == "inner":
+            matched = positions >= 0
+            if not matched.all():
+                df, positions = df[matched], positions[matched]
+        fill = how == "left" and bool((positions < 0).any())
+        overlap = set(self.columns) & set(df.columns)
+        if overlap:
+            df = df.rename(columns={c: "{}{}".format(c, suffixes[0]) for c in overlap})
+        names = {c: "{}{}".format(c, suffixes[1]) for c in overlap}
+        joined = pd.DataFrame(
+            {
+                names.get(column, column): pd.api.extensions.take(
+                    values, positions, allow_fill=fill
+                )
+                for column, values in self._values.items()
+            },
+            index=df.index,
+        )
+        return pd.concat([df, joined], axis=1)
+
+    def join_chunks(self, chunks, on=None, how="left", suffixes=("_x", "_y")):
+        """Join every frame of `chunks`, e.g. from `stream_df_from_csvs`.
+
+        Yields
+        ------
+        `pandas.core.frame.DataFrame`
+            The joined chunks, see `join`.
+        """
+        for chunk in chunks:
+            yield self.join(chunk, on=on, how=how, suffixes=suffixes)
+
+
+class AggregationState:
+
+    """Mergeable partial aggregate, the incremental form of `aggregate_by_functions`
+
+    Keeps count, sum, min, max, mean and the sum of squared deviations of every
+    group, mean/variance being combined with Welford's (Chan's) update. States
+    can be updated chunk by chunk, merged across workers, and finalize to the
+    output of `aggregate_by_functions(df, column_name, group_by, functions)`.
+
+    Parameters
+    ----------
+    column_name : str
+        Column to aggregate
+    group_by : str or list
+        Column(s) to group by
+    functions : list, optional
+        Any of 'sum', 'count', 'min', 'max', 'mean' and 'var'.
+    """
+
+    FUNCTIONS = ("sum", "count", "min", "max", "mean", "var")
+
+    def __init__(self, column_name, group_by, functions=["sum", "count"]):
+        unknown = [func for func in functions if func not in self.FUNCTIONS]
+        if unknown:
+            raise ValueError("Unsupported function(s): {}".format(unknown))
+        self.column_name = column_name
+        self.group_by = group_by
+        self.functions = list(functions)
+        self._dtype = None
+        self._state = None
+
+    def update(self, df):
+        """Add the rows of `df` to the aggregate.
+
+        Parameters
+        ----------
+        df : pandas.core.frame.DataFrame
+            Chunk of data
+
+        Returns
+        -------
+        AggregationState
+            self
+        """
+        grouped = df.groupby(self.group_by, sort=False, observed=True)
+        chunk = grouped[self.column_name].agg(
+            ["count", "sum", "min", "max", "mean", "var"]
+        )
+        chunk["m2"] = (chunk.pop("var") * (chunk["count"] - 1)).fillna(0.0)
+        chunk["mean"] = chunk["mean"].fillna(0.0)
+        if self._dtype is None:
+            self._dtype = df[self.column_name].dtype
+        return self._combine(chunk)
+
+    def merge(self, other):
+        """Merge the aggregate of another worker or shard.
+
+        Parameters
+        ----------
+        other : AggregationState
+            State over the same column and groups
+
+        Returns
+        -------
+        AggregationState
+            self
+        """
+        if (other.column_name, other.group_by) != (self.column_name, self.group_by):
+            raise ValueError("Cannot merge aggregates of different columns or groups")
+        if other._state is not None:
+            if self._dtype is None:
+                self._dtype = other._dtype
+            self._combine(other._state)
+        return self
+
+    def _combine(self, other):
+        if self._state is None:
+            self._state = other
+            return self
+        left = self._state
+        index = left.index.append(other.index[~other.index.isin(left.index)])
+        additive = ["count", "sum", "mean", "m2"]
+        left_add = left[additive].reindex(index, fill_value=0)
+        right_add = other[additive].reindex(index, fill_value=0)
+
+        n_left, n_right = left_add["count"], right_add["count"]
+        count = n_left + n_right
+        delta = right_add["mean"] - left_add["mean"]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = (left_add["mean"] + delta * n_right / count).fillna(0.0)
+            m2 = (
+                left_add["m2"] + right_add["m2"] + delta ** 2 * n_left * n_right / count
+            ).fillna(0.0)
+        self._state = pd.DataFrame(
+            {
+                "count": count,
+                "sum": left_add["sum"] + right_add["sum"],
+                "min": np.fmin(left["min"].reindex(index), other["min"].reindex(index)),
+                "max": np.fmax(left["max"].reindex(index), other["max"].reindex(index)),
+                "mean": mean,
+                "m2": m2,
+            },
+            index=index,
+        )
+        return self
+
+    def finalize(self):
+        """Aggregate in the format of `aggregate_by_functions`.
+
+        Returns
+        -------
+        `pandas.core.frame.DataFrame`
+            DataFrame
+        """
+        if self._state is None:
+            return pd.DataFrame(columns=self.functions)
+        state = self._state
+        count = state["count"]
+        results = {}
+        for func in self.functions:
+            if func == "count":
+                results[func] = count.astype(np.int64)
+            elif func == "mean":
+                results[func] = state["mean"].where(count > 0)
+            elif func == "var":
+                with np.errstate(invalid="ignore", divide="ignore"):
+                    results[func] = (state["m2"] / (count - 1)).where(count > 1)
+            elif func in ("min", "max"):
+                result = state[func]
+                if is_integer_dtype(self._dtype) and result.notna().all():
+                    result = result.astype(self._dtype)
+                results[func] = result
+            else:
+                results[func] = state[func]
+        return pd.DataFrame(results, index=state.index)
+
+
+def _hashed_counts(values):
+    """Distinct non-null `values`, their counts and 64-bit hashes.
+
+    Only the distinct values are hashed, with `pandas.util.hash_pandas_object`,
+    so equal strings hash equally whether they are object, str or category.
+    """
+    codes, uniques = pd.factorize(values)
+    counts = np.bincount(codes + 1, minlength=len(uniques) + 1)[1:]
+    if isinstance(uniques, pd.CategoricalIndex):
+        uniques = pd.Index(uniques.to_numpy())
+    uniques = pd.Index(uniques)
+    hashes = pd.util.hash_pandas_object(uniques, index=False).to_numpy()
+    return uniques, counts, hashes
+
+
+def _bit_length(values):
+    """`int.bit_length` of every uint64 in `values`, exact via `numpy.frexp`."""
+    high = (values >> np.uint64(32)).astype(np.float64)
+    low = (values & np.uint64(0xFFFFFFFF)).astype(np.float64)
+    return np.where(high > 0, np.frexp(high)[1] + 32, np.frexp(low)[1])
+
+
+class CountMinSketch:
+
+    """Mergeable approximate counts and top-k of the values of a stream
+
+    A `depth` x `width` table of counters, each value being counted in one
+    counter of every row and estimated by the smallest of them. With
+    ``width = ceil(e / epsilon)`` and ``depth = ceil(ln(1 / delta))`` an
+    estimate overshoots the true count by at most ``epsilon * total`` with
+    probability ``1 - delta``, and never undershoots it. The `capacity` values
+    with the largest estimates are kept as heavy hitter candidates, so memory
+    is bounded whatever the cardinality of the stream.
+
+    Parameters
+    ----------
+    epsilon : float, optional
+        Relative error of the counts.
+    delta : float, optional
+        Probability of exceeding the error.
+    capacity : int, optional
+        Number of candidate values kept for `top`, must be >= the `k` asked.
+    """
+
+    def __init__(self, epsilon=0.001, delta=0.01, capacity=1000):
+        if not 0 < epsilon < 1 or not 0 < delta < 1:
+            raise ValueError("epsilon and delta must be between 0 and 1")
+        self.width = int(np.ceil(np.e / epsilon))
+        self.depth = int(np.ceil(np.log(1 / delta)))
+        self.capacity = capacity
+        self.total = 0
+        self.table = np.zeros((self.depth, self.width), dtype=np.int64)
+        self._values = pd.Index([])
+        self._hashes = np.array([], dtype=np.uint64)
+        self._estimates = np.array([], dtype=np.int64)
+
+    @property
+    def error(self):
+        """Bound on the overshoot of any estimate, ``epsilon * total``."""
+        return int(np.ceil(np.e / self.width * self.total))
+
+    @property
+    def nbytes(self):
+        return self.table.nbytes + self._hashes.nbytes + self._values.memory_usage()
+
+    def _cells(self, hashes):
+        # Double hashing: row i uses h1 + i * h2, on the halves of the hash.
+        h1 = hashes & np.uint64(0xFFFFFFFF)
+        h2 = (hashes >> np.uint64(32)) | np.uint64(1)
+        rows = np.arange(self.depth, dtype=np.uint64)[:, None]
+        return ((h1 + rows * h2) % np.uint64(self.width)).astype(np.intp)
+
+    def _estimate(self, hashes):
+        if not len(hashes):
+            return np.array([], dtype=np.int64)
+        cells = self._cells(hashes)
+        return self.table[np.arange(self.depth)[:, None], cells].min(axis=0)
+
+    def _add_candidates(self, values, hashes):
+        values = self._values.append(values) if len(self._values) else values
+        hashes = np.concatenate([self._hashes, hashes])
+        _, first = np.unique(hashes, return_index=True)
+        first.sort()
+        estimates = self._estimate(hashes[first])
+        keep = np.sort(_top_k(estimates, self.capacity))
+        self._values = values.take(first[keep])
+        self._hashes = hashes[first[keep]]
+        self._estimates = estimates[keep]
+
+    def update(self, values):
+        """Count the values of a chunk, NaN's are ignored.
+
+        Parameters
+        ----------
+        values : pandas.Series or array-like
+            Chunk of a column
+
+        Returns
+        -------
+        CountMinSketch
+            self
+        """
+        return self._add(*_hashed_counts(values))
+
+    def _add(self, uniques, counts, hashes):
+        cells = self._cells(hashes) + (np.arange(self.depth) * self.width)[:, None]
+        self.table += np.bincount(
+            cells.ravel(), weights=np.tile(counts, self.depth), minlength=self.table.size
+        ).astype(np.int64).reshape(self.table.shape)
+        self.total += int(counts.sum())
+        self._add_candidates(uniques, hashes)
+        return self
+
+    def merge(self, other):
+        """Merge the sketch of another worker or shard.
+
+        Parameters
+        ----------
+        other : CountMinSketch
+            Sketch with the same `epsilon` and `delta`
+
+        Returns
+        -------
+        CountMinSketch
+            self
+        """
+        if self.table.shape != other.table.shape:
+            raise ValueError("Cannot merge sketches of different widths or depths")
+        self.table += other.table
+        self.total += other.total
+        self._add_candidates(other._values, other._hashes)
+        return self
+
+    def estimate(self, values):
+        """Estimated counts of `values`.
+
+        Parameters
+        ----------
+        values : list-like
+            Values to look up
+
+        Returns
+        -------
+        `pandas.Series`
+            Estimated count of every value, indexed by value
+        """
+        values = pd.Index(values)
+        hashes = pd.util.hash_pandas_object(values, index=False).to_numpy()
+        return pd.Series(self._estimate(hashes), index=values, name="count")
+
+    def top(self, k=3):
+        """The `k` values with the largest estimated counts, largest first.
+
+        Parameters
+        ----------
+        k : int, optional
+            Number of values
+
+        Returns
+        -------
+        `pandas.Series`
+            Estimated counts indexed by value
+        """
+        if k > self.capacity:
+            raise ValueError("k={} exceeds the capacity {}".format(k, self.capacity))
+        top = _top_k(self._estimates, k)
+        return pd.Series(self._estimates[top], index=self._values.take(top), name="count")
+
+
+class HyperLogLog:
+
+    """Mergeable approximate count of the distinct values of a stream
+
+    ``2 ** precision`` one-byte registers keep the longest run of leading zeros
+    seen among the hashes routed to them. The relative standard error of
+    `count` is about ``1.04 / sqrt(2 ** precision)``, so the precision is the
+    smallest that reaches `error`.
+
+    Parameters
+    ----------
+    error : float, optional
+        Relative standard error of the distinct count.
+    """
+
+    def __init__(self, error=0.01):
+        if not 0 < error < 1:
+            raise ValueError("error must be between 0 and 1")
+        self.precision = int(min(max(np.ceil(2 * np.log2(1.04 / error)), 4), 18))
+        self.registers = np.zeros(2 ** self.precision, dtype=np.uint8)
+
+    @property
+    def nbytes(self):
+        return self.registers.nbytes
+
+    def update(self, values):
+        """Add the values of a chunk, NaN's are ignored.
+
+        Parameters
+        ----------
+        values : pandas.Series or array-like
+            Chunk of a column
+
+        Returns
+        -------
+        HyperLogLog
+            self
+        """
+        return self._add(*_hashed_counts(values))
+
+    def _add(self, uniques, counts, hashes):
+        bits = 64 - self.precision
+        buckets = (hashes >> np.uint64(bits)).astype(np.intp)
+        rest = hashes & np.uint64((1 << bits) - 1)
+        ranks = (bits - _bit_length(rest) + 1).astype(np.uint8)
+        np.maximum.at(self.registers, buckets, ranks)
+        return self
+
+    def merge(self, other):
+        """Merge the sketch of another worker or shard.
+
+        Parameters
+        ----------
+        other : HyperLogLog
+            Sketch with the same precision
+
+        Returns
+        -------
+        HyperLogLog
+            self
+        """
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge sketches of different precisions")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def count(self):
+        """Estimated number of distinct values.
+
+        Returns
+        -------
+        int
+            Distinct count
+        """
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(int)))
+        zeros = np.count_nonzero(self.registers == 0)
+        if estimate <= 2.5 * m and zeros:
+            # Linear counting is more accurate for small cardinalities.
+            estimate = m * np.log(m / zeros)
+        return int(round(estimate))
+
+
+def _row_hashes(data):
+    """uint64 hash of every row of `data`, with -0.0 hashing as 0.0."""
+    columns = {
+        # Adding 0.0 turns -0.0 into 0.0, which hash differently otherwise.
+        i: col + 0.0 if is_float_dtype(col.dtype) else col
+        for i, (_, col) in enumerate(data.items())
+    }
+    data = pd.DataFrame(columns, index=data.index, copy=False)
+    return pd.util.hash_pandas_object(data, index=False).to_numpy()
+
+
+class DuplicateTracker:
+
+    """Out-of-core duplicate detection over a stream of frames
+
+    Rows are identified by a 64-bit hash of the `subset` columns, combined
+    column by column with `pandas.util.hash_pandas_object`, and only the sorted
+    hashes of the distinct rows seen so far and their counts are kept. A row is
+    a duplicate when an equal row was seen earlier in the same or a previous
+    chunk, as with `drop_duplicates(keep='first')`.
+
+    Two different rows share a hash with a probability of about
+    ``n ** 2 / 2 ** 65``. With `verify` such collisions are told apart by
+    comparing the rows themselves, at the cost of also keeping the `subset`
+    values of every distinct row. Chunks should have the same dtypes, an int
+    and a float column hash differently.
+
+    Parameters
+    ----------
+    subset : list, optional
+        Columns identifying a row, all columns by default.
+    verify : bool, optional
+        Compare the rows of equal hashes instead of trusting the hash.
+    """
+
+    def __init__(self, subset=None, verify=False):
+        self.subset = subset
+        self.verify = verify
+        self.rows = 0
+        self.duplicates = 0
+        self.collisions = 0
+        self._hashes = np.array([], dtype=np.uint64)
+        self._counts = np.array([], dtype=np.int64)
+        self._stored = []
+
+    @property
+    def nbytes(self):
+        stored = sum(
+            hashes.nbytes + rows.memory_usage(index=False).sum()
+            for hashes, rows in self._stored
+        )
+        return self._hashes.nbytes + self._counts.nbytes + int(stored)
+
+    def _hash(self, df):
+        data = df if self.subset is None else df[self.subset]
+        return data, _row_hashes(data)
+
+    def _find(self, hashes):
+        """Positions of `hashes` in the seen hashes, -1 when not seen."""
+        positions = np.searchsorted(self._hashes, hashes)
+        found = positions < len(self._hashes)
+        found[found] = self._hashes[positions[found]] == hashes[found]
+        return np.where(found, positions, -1)
+
+    def _verify(self, data, hashes, duplicated):
+        """Exact duplicates among the rows whose hash repeats."""
+        keys = np.unique(hashes[duplicated])
+        rows = np.flatnonzero(np.isin(hashes, keys))
+        stored = [
+            stored_rows[np.isin(stored_hashes, keys)]
+            for stored_hashes, stored_rows in self._stored
+        ]
+        pool = pd.concat(stored + [data.iloc[rows]], ignore_index=True)
+        exact = pool.duplicated().to_numpy()[len(pool) - len(rows):]
+        self.collisions += int(np.count_nonzero(duplicated[rows] & ~exact))
+        duplicated[rows] = exact
+        return duplicated
+
+    def update(self, df):
+        """Add the rows of a chunk and flag its duplicates.
+
+        Parameters
+        ----------
+        df : pandas.core.frame.DataFrame
+            Chunk of data
+
+        Returns
+        -------
+        `numpy.ndarray`
+            Boolean mask of the rows of `df` seen before
+        """
+        data, hashes = self._hash(df)
+        uniques, first, counts = np.unique(hashes, return_index=True, return_counts=True)
+        positions = self._find(uniques)
+
+        duplicated = np.ones(len(hashes), dtype=bool)
+        duplicated[first[positions < 0]] = False
+        if self.verify and duplicated.any():
+            duplicated = self._verify(data, hashes, duplicated)
+        if self.verify:
+            self._stored.append((hashes[~duplicated], data[~duplicated]))
+
+        seen = positions >= 0
+        self._counts[positions[seen]] += counts[seen]
+        insert = np.searchsorted(self._hashes, uniques[~seen])
+        self._hashes = np.insert(self._hashes, insert, uniques[~seen])
+        self._counts = np.insert(self._counts, insert, counts[~seen])
+        self.rows += len(hashes)
+        self.duplicates += int(np.count_nonzero(duplicated))
+        return duplicated
+
+    def drop_duplicates(self, df):
+        """The rows of `df` not seen before, see `update`.
+
+        Parameters
+        ----------
+        df : pandas.core.frame.DataFrame
+            Chunk of data
+
+        Returns
+        -------
+        `pandas.core.frame.DataFrame`
+            DataFrame without duplicates
+        """
+        return df[~self.update(df)]
+
+    def drop_duplicates_chunks(self, chunks):
+        """Drop the duplicates of every frame of `chunks`, across chunks.
+
+        Yields
+        ------
+        `pandas.core.frame.DataFrame`
+            The chunks without duplicates, see `drop_duplicates`.
+        """
+        for chunk in chunks:
+            yield self.drop_duplicates(chunk)
+
+    def counts(self, df):
+        """Number of times each row of `df` was seen.
+
+        Rows sharing a hash are counted together, even with `verify`.
+
+        Parameters
+        ----------
+        df : pandas.core.frame.DataFrame
+            Rows to look up, e.g. the deduplicated frame
+
+        Returns
+        -------
+        `pandas.Series`
+            Count of every row, indexed like `df`
+        """
+        _, hashes = self._hash(df)
+        positions = self._find(hashes)
+        # Position -1, not seen, lands on the appended zero.
+        counts = np.append(self._counts, 0)[positions]
+        return pd.Series(counts, index=df.index, name="count")
+
+
+def _renamed_columns(columns, new_names=(), prefix=None, suffix=None):
+    """Column labels after `PandasUtilities.rename_cols`."""
+    if new_names and len(new_names) == len(columns):
+        columns = pd.Index([str(name).replace(" ", "_") for name in new_names])
+    if prefix:
+        columns = pd.Index(["{}{}".format(prefix, name) for name in columns])
+    if suffix:
+        columns = pd.Index(["{}{}".format(name, suffix) for name in columns])
+    return columns
+
+
+def _category_mask(df, column_name, filter_by, exclude=False):
+    """Boolean mask of the rows whose `column_name` is (not) in `filter_by`."""
+    index = PandasUtilities.column_indexes.get(df, column_name)
+    if index is not None:
+        mask = np.zeros(len(df), dtype=bool)
+        mask[index.positions(filter_by)] = True
+    else:
+        col = df[column_name]
+        lookup = filter_by if isinstance(filter_by, CategoryFilter) else None
+        if lookup is None and isinstance(col.dtype, pd.CategoricalDtype):
+            lookup = CategoryFilter(filter_by)
+        mask = lookup.mask(col) if lookup is not None else col.isin(filter_by)
+        mask = np.asarray(mask, dtype=bool)
+    return ~mask if exclude else mask
+
+
+def _notna_mask(df, column_name, how="any", min_count=None):
+    """Boolean mask of the rows without NaN's in `column_name`, a label or a list.
+
+    See `NullProfile.null_rows` for `how` and `min_count`.
+    """
+    profile = PandasUtilities.null_profiles.get(df)
+    if profile is not None:
+        return ~profile.null_rows(column_name, how, min_count)
+    columns = column_name
+    if not pd.api.types.is_list_like(columns) or isinstance(columns, tuple):
+        columns = [columns]
+    index = PandasUtilities.column_indexes.get(df, columns[0])
+    if len(columns) == 1 and index is not None:
+        counts = index.nan_mask()
+    else:
+        counts = np.zeros(len(df), dtype=np.int64)
+        for column in columns:
+            counts += np.asarray(pd.isna(df[column]), dtype=bool)
+    return ~_null_rows(counts, len(columns), how, min_count)
+
+
+def _notin_mask(df, column_name, values):
+    return _category_mask(df, column_name, values, exclude=True)
+
+
+def _between_mask(df, column_name, bounds):
+    low, high = bounds
+    return np.asarray(df[column_name].between(low, high), dtype=bool)
+
+
+# Row predicates of the csv readers: name -> (mask function, number of arguments).
+_PREDICATES = {
+    "isin": (_category_mask, 1),
+    "notin": (_notin_mask, 1),
+    "notna": (_notna_mask, 0),
+    "between": (_between_mask, 1),
+}
+
+
+def _check_filters(filters):
+    """Validate (column, predicate, *arguments) row filters, see `_PREDICATES`."""
+    checked = []
+    for row_filter in filters or []:
+        row_filter = tuple(row_filter)
+        if len(row_filter) < 2 or row_filter[1] not in _PREDICATES:
+            raise ValueError(
+                "Filters must be (column, predicate[, argument]) with a predicate of "
+                "{}, got {!r}".format(sorted(_PREDICATES), row_filter)
+            )
+        if len(row_filter) - 2 != _PREDICATES[row_filter[1]][1]:
+            raise ValueError(
+                "Wrong number of arguments in filter {!r}".format(row_filter)
+            )
+        checked.append(row_filter)
+    return checked
+
+
+def _filter_rows(df, filters):
+    """Rows of `df` matching all `filters`."""
+    if not filters:
+        return df
+    mask = np.ones(len(df), dtype=bool)
+    for column_name, predicate, *args in filters:
+        mask &= _PREDICATES[predicate][0](df, column_name, *args)
+    return df[mask]
+
+
+_PROFILER = None
+
+_PROFILE_FIELDS = (
+    "calls",
+    "wall_time",
+    "cpu_time",
+    "max_wall_time",
+    "rows_in",
+    "rows_out",
+    "max_columns_in",
+    "max_columns_out",
+    "peak_memory",
+    "views",
+    "partial_views",
+    "copies",
+)
+
+
+def _shape(obj):
+    """(rows, columns) of a frame or Series, None for other objects.
+
+    Of a tuple, e.g. `optimize_memory`'s (frame, report, dtypes), only the first
+    item counts, a list of frames counts all their rows.
+    """
+    if isinstance(obj, tuple) and obj:
+        return _shape(obj[0])
+    if isinstance(obj, pd.DataFrame):
+        return obj.shape
+    if isinstance(obj, pd.Series):
+        return len(obj), 1
+    if isinstance(obj, list):
+        shapes = [_shape(item) for item in obj if isinstance(item, pd.DataFrame)]
+        if shapes:
+            return sum(rows for rows, _ in shapes), shapes[0][1]
+    return None
+
+
+def _byte_ranges(obj):
+    """(start, stop) memory addresses of the numpy backed columns of `obj`."""
+    try:
+        byte_bounds = np.lib.array_utils.byte_bounds
+    except AttributeError:  # numpy < 2
+        byte_bounds = np.byte_bounds
+    columns = obj.items() if isinstance(obj, pd.DataFrame) else [(obj.name, obj)]
+    return [
+        byte_bounds(col.to_numpy(copy=False))
+        for _, col in columns
+        if isinstance(col.dtype, np.dtype) and len(col)
+    ]
+
+
+def _result_kind(source, result):
+    """Whether `result` is a 'view' of `source`, a 'partial' view or a 'copy'.
+
+    None when either is not a frame or Series or has no numpy backed columns.
+    """
+    if isinstance(result, tuple) and result:
+        result = result[0]
+    frames = (pd.DataFrame, pd.Series)
+    if not isinstance(source, frames) or not isinstance(result, frames):
+        return None
+    source_ranges = sorted(_byte_ranges(source))
+    result_ranges = _byte_ranges(result)
+    if not source_ranges or not result_ranges:
+        return None
+    starts = [start for start, _ in source_ranges]
+    stops = np.maximum.accumulate([stop for _, stop in source_ranges])
+    shared = 0
+    for start, stop in result_ranges:
+        # Source ranges starting before `stop`, overlapping if one ends after `start`.
+        n = bisect.bisect_left(starts, stop)
+        shared += bool(n and stops[n - 1] > start)
+    if shared == len(result_ranges):
+        return "view"
+    return "partial" if shared else "copy"
+
+
+class Profiler:
+
+    """Collect timing, size and memory statistics of `PandasUtilities` calls.
+
+    Profiling is opt-in: while no profiler runs, the methods cost one extra
+    global lookup. Only the outermost call is measured, methods calling other
+    methods count towards their caller. Generators, e.g. `stream_df_from_csvs`,
+    are measured while their chunks are produced.
+
+    >>> with Profiler() as profiler:
+    ...     df = PandasUtilities.remove_rows_with_nan(df, "value")
+    >>> profiler.stats()["remove_rows_with_nan"]["wall_time"]
+
+    Parameters
+    ----------
+    memory : bool, optional
+        Record the tracemalloc peak memory of every call. Tracing slows down the
+        calls, and the peak of concurrent calls from other threads is included.
+    """
+
+    def __init__(self, memory=False):
+        self.memory = memory
+        self._stats = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._previous = None
+        self._tracing = False
+
+    def start(self):
+        """Start collecting, profilers can be nested."""
+        global _PROFILER
+        self._previous, _PROFILER = _PROFILER, self
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._tracing = True
+        return self
+
+    def stop(self):
+        """Stop collecting and reactivate the enclosing profiler, if any."""
+        global _PROFILER
+        _PROFILER, self._previous = self._previous, None
+        if self._tracing:
+            tracemalloc.stop()
+            self._tracing = False
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def reset(self):
+        """Discard the collected statistics."""
+        with self._lock:
+            self._stats.clear()
+
+    def stats(self):
+        """Statistics per method, ordered by total wall time.
+
+        Returns
+        -------
+        dict
+            Maps method names to their number of `calls`, total and maximum wall
+            time and total CPU time in seconds, total rows and maximum columns of
+            the input and output, `peak_memory` in bytes (None unless `memory`)
+            and how many results were `views`, `partial_views` or `copies` of
+            the input.
+        """
+        with self._lock:
+            stats = {name: dict(stat) for name, stat in self._stats.items()}
+        return dict(sorted(stats.items(), key=lambda item: -item[1]["wall_time"]))
+
+    def to_json(self, path=None, **kwargs):
+        """Dump `stats` as JSON, to `path` if given.
+
+        Parameters
+        ----------
+        path : str, optional
+            File to write.
+        **kwargs
+            Keyword arguments of `json.dumps`, e.g. `indent`.
+
+        Returns
+        -------
+        str
+            The JSON document.
+        """
+        document = json.dumps(self.stats(), **kwargs)
+        if path is not None:
+            with open(path, "w") as f:
+                f.write(document)
+        return document
+
+    def _call(self, name, func, args, kwargs):
+        if getattr(self._local, "active", False):
+            return func(*args, **kwargs)
+        self._local.active = True
+        try:
+            measure = self._measure()
+            result = func(*args, **kwargs)
+            wall_time, cpu_time, peak = measure()
+        finally:
+            self._local.active = False
+        source = args[0] if args else kwargs.get("df")
+        if inspect.isgenerator(result):
+            return self._iterate(name, source, result)
+        self._record(name, source, result, wall_time, cpu_time, peak)
+        return result
+
+    def _iterate(self, name, source, chunks):
+        wall_time = cpu_time = 0.0
+        peak = None
+        rows, columns = 0, None
+        try:
+            while True:
+                self._local.active = True
+                try:
+                    measure = self._measure()
+                    chunk = next(chunks, None)
+                    elapsed = measure()
+                finally:
+                    self._local.active = False
+                wall_time += elapsed[0]
+                cpu_time += elapsed[1]
+                if elapsed[2] is not None:
+                    peak = max(peak or 0, elapsed[2])
+                if chunk is None:
+                    break
+                shape = _shape(chunk)
+                if shape is not None:
+                    rows, columns = rows + shape[0], shape[1]
+                yield chunk
+        finally:
+            output = None if columns is None else (rows, columns)
+            self._record(name, source, None, wall_time, cpu_time, peak, output)
+
+    def _measure(self):
+        """Start measuring, the returned function gives (wall, cpu, peak memory)."""
+        if self.memory:
+            tracemalloc.reset_peak()
+            memory = tracemalloc.get_traced_memory()[0]
+        wall_time, cpu_time = time.perf_counter(), time.process_time()
+
+        def stop():
+            peak = None
+            if self.memory:
+                peak = max(tracemalloc.get_traced_memory()[1] - memory, 0)
+            return time.perf_counter() - wall_time, time.process_time() - cpu_time, peak
+
+        return stop
+
+    def _record(self, name, source, result, wall_time, cpu_time, peak, output=None):
+        shape_in = _shape(source)
+        shape_out = output or _shape(result)
+        kind = _result_kind(source, result)
+        with self._lock:
+            stats = self._stats.get(name)
+            if stats is None:
+                stats = self._stats[name] = dict.fromkeys(_PROFILE_FIELDS, 0)
+                stats["wall_time"] = stats["cpu_time"] = stats["max_wall_time"] = 0.0
+                stats["peak_memory"] = None
+            stats["calls"] += 1
+            stats["wall_time"] += wall_time
+            stats["cpu_time"] += cpu_time
+            stats["max_wall_time"] = max(stats["max_wall_time"], wall_time)
+            if shape_in is not None:
+                stats["rows_in"] += shape_in[0]
+                stats["max_columns_in"] = max(stats["max_columns_in"], shape_in[1])
+            if shape_out is not None:
+                stats["rows_out"] += shape_out[0]
+                stats["max_columns_out"] = max(stats["max_columns_out"], shape_out[1])
+            if peak is not None:
+                stats["peak_memory"] = max(stats["peak_memory"] or 0, peak)
+            if kind is not None:
+                key = {"view": "views", "partial": "partial_views", "copy": "copies"}
+                stats[key[kind]] += 1
+
+
+def _profiled(name, func):
+    """Wrap `func` to report to the active `Profiler`, if any."""
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        profiler = _PROFILER
+        if profiler is None:
+            return func(*args, **kwargs)
+        return profiler._call(name, func, args, kwargs)
+
+    return wrapper
+
+
+class LazyFrame:
+
+    """Record row filters, column selections and renames, run them at `collect`.
+
+    The methods mirror their `PandasUtilities` namesakes but only update a plan:
+    the row filters are evaluated on the columns they need and combined into a
+    single boolean mask, column selections only narrow the list of columns to
+    keep and renames only change their labels. `collect` then copies the kept
+    rows of the kept columns once.
+
+    >>> df = (
+    ...     PandasUtilities.lazy(df)
+    ...     .remove_rows_with_nan("price")
+    ...     .filter_by_multiple_categories("genre", ["Rock", "Jazz"])
+    ...     .select_by_datatype(include_datatype=["number"])
+    ...     .rename_cols(prefix="sales_")
+    ...     .collect()
+    ... )
+
+    Columns are referred to by their name at that point of the chain. Unlike
+    `PandasUtilities.rename_cols`, `rename_cols` never modifies the input.
+
+    Parameters
+    ----------
+    df : pandas.core.frame.DataFrame
+        Two-dimensional size-mutable,
+        potentially heterogeneous tabular data
+    """
+
+    def __init__(self, df):
+        self._df = df
+        self._positions = list(range(df.shape[1]))
+        self._names = list(df.columns)
+        self._filters = []
+
+    def _copy(self):
+        lazy = LazyFrame.__new__(LazyFrame)
+        lazy._df = self._df
+        lazy._positions = list(self._positions)
+        lazy._names = list(self._names)
+        lazy._filters = list(self._filters)
+        return lazy
+
+    def _source_column(self, column_name):
+        """Label in the input frame of the current column `column_name`."""
+        try:
+            position = self._positions[self._names.index(column_name)]
+        except ValueError:
+            raise KeyError(column_name) from None
+        return self._df.columns[position]
+
+    @property
+    def columns(self):
+        """Column labels of the collected frame."""
+        return pd.Index(self._names)
+
+    def remove_rows_with_nan(self, column_name, how="any", min_count=None):
+        """Drop the rows with NaN's in `column_name`, a label or a list."""
+        if pd.api.types.is_list_like(column_name) and not isinstance(column_name, tuple):
+            columns = [self._source_column(column) for column in column_name]
+        else:
+            columns = self._source_column(column_name)
+        lazy = self._copy()
+        lazy._filters.append((_notna_mask, columns, (how, min_count)))
+        return lazy
+
+    def filter_by_multiple_categories(self, column_name, filter_by=[], exclude=False):
+        """Keep the rows whose `column_name` is in `filter_by`, or not with `exclude`."""
+        lazy = self._copy()
+        lazy._filters.append(
+            (_category_mask, self._source_column(column_name), (filter_by, exclude))
+        )
+        return lazy
+
+    def select_by_datatype(self, include_datatype=[], exclude_datatype=[]):
+        """Keep the columns of the included and not excluded data-types."""
+        if not include_datatype and not exclude_datatype:
+            return self
+        # The dtypes are known from the input, select on an empty frame.
+        empty = self._df.iloc[:0, self._positions].set_axis(
+            range(len(self._positions)), axis=1
+        )
+        keep = empty.select_dtypes(include=include_datatype, exclude=exclude_datatype)
+        lazy = self._copy()
+        lazy._positions = [self._positions[i] for i in keep.columns]
+        lazy._names = [self._names[i] for i in keep.columns]
+        return lazy
+
+    def rename_cols(self, new_names=[], prefix=None, suffix=None):
+        """Rename the columns, as `PandasUtilities.rename_cols` does."""
+        lazy = self._copy()
+        lazy._names = list(_renamed_columns(lazy._names, new_names, prefix, suffix))
+        return lazy
+
+    def explain(self):
+        """Describe the plan `collect` executes.
+
+        Returns
+        -------
+        str
+            The combined row filters and the selected columns.
+        """
+        steps = [
+            "filter: {}({})".format(
+                mask.__name__.strip("_"), ", ".join(map(repr, (column,) + args))
+            )
+            for mask, column, args in self._filters
+        ]
+        columns = [self._df.columns[position] for position in self._positions]
+        steps.append("select: {}".format(columns))
+        steps.append("rename: {}".format(self._names))
+        return "\n".join(steps)
+
+    def collect(self):
+        """Execute the plan.
+
+        Returns
+        -------
+        `pandas.core.frame.DataFrame`
+            The filtered rows of the selected columns, with their new names.
+        """
+        df = self._df
+        mask = None
+        for filter_mask, column_name, args in self._filters:
+            rows = filter_mask(df, column_name, *args)
+            mask = rows if mask is None else mask & rows
+        if mask is None:
+            mask = slice(None)
+        if self._positions == list(range(df.shape[1])):
+            result = df.iloc[mask] if self._filters else df.copy(deep=False)
+        else:
+            result = df.iloc[mask, self._positions]
+        return result.set_axis(self._names, axis=1)
 
 
 class PandasUtilities:
@@ -13,37 +2498,187 @@ class PandasUtilities:
 
     __version__ = pd.__version__
 
+    column_indexes = ColumnIndexCache()
+    null_profiles = NullProfileCache()
+
+    GOOGLE_SHEET_URL = "https://docs.google.com/spreadsheets/d/{}/export?format=csv"
+
     @staticmethod
     def show_version():
         return pd.show_versions()
 
     @staticmethod
-    def create_random_df(rows, cols, cols_name=None):
+    def create_random_df(
+        rows, cols=None, cols_name=None, schema=None, nan_fraction=0.0, seed=None
+    ):
         """Create a random dataframe with n-rows and n-columns
 
+        Without `schema`, `nan_fraction` and `seed` the columns are float64 values
+        drawn from `np.random.rand`. Otherwise the frame is drawn in one chunk of
+        `generate_random_df`, see there for the schema format.
+
         Parameters
         ----------
         rows : int
             number of rows
-        cols : int
-            number of columns
+        cols : int, optional
+            number of float64 columns, not needed with `schema`
         cols_name : None, optional
             Columns names
+        schema : dict, optional
+            Mixed column types, e.g. {'id': 'int', 'genre': 'category'}.
+        nan_fraction : float, optional
+            Default fraction of missing values per column.
+        seed : int or numpy.random.SeedSequence, optional
+            Seed for reproducible frames.
 
         Returns
         -------
         `pandas.core.frame.DataFrame`
             Data frame containing random values
+
+        Raises
+        ------
+        ValueError
+            If the number of `cols_name` differs from `cols`.
         """
         if cols_name:
             cols_name = list(cols_name)
-            assert len(cols_name) == cols
-        return pd.DataFrame(np.random.rand(rows, cols), columns=cols_name)
+            if len(cols_name) != cols:
+                raise ValueError(
+                    "Expected {} column names, got {}".format(cols, len(cols_name))
+                )
+        if schema is None and not nan_fraction and seed is None:
+            return pd.DataFrame(np.random.rand(rows, cols), columns=cols_name)
+        if schema is None:
+            schema = dict.fromkeys(cols_name or range(cols), "float64")
+        return next(
+            PandasUtilities.generate_random_df(
+                rows, schema, chunksize=max(rows, 1), nan_fraction=nan_fraction, seed=seed
+            ),
+            pd.DataFrame(columns=list(schema)),
+        )
+
+    @staticmethod
+    def generate_random_df(
+        rows, schema, chunksize=1000000, nan_fraction=0.0, seed=None, max_workers=None
+    ):
+        """Generate a random frame of a mixed schema in chunks
+
+        Every chunk is drawn from its own `numpy.random.Generator`, seeded with
+        the child of `numpy.random.SeedSequence(seed)` of its chunk number, so the
+        output does not depend on `max_workers` and a SeedSequence passed as
+        `seed` is not changed. Only a few chunks are held in memory at a time, which makes
+        it possible to produce fixtures larger than RAM (see `write_random_df`).
+
+        Parameters
+        ----------
+        rows : int
+            Total number of rows.
+        schema : dict
+            Maps column names to a type name or a dict with a 'dtype' key and
+            options, e.g. {'genre': {'dtype': 'category', 'cardinality': 1000}}:
+
+            - 'float64', 'float32': uniform in [0, 1).
+            - 'int': uniform in ['low', 'high'), nullable Int64 with NaNs.
+            - 'category': 'cardinality' categories with Zipf ('zipf') skew.
+            - 'datetime': uniform in ['start', 'end') with resolution 'freq'.
+            - 'string': random lowercase strings of 'length' characters.
+
+            Every column accepts 'nan', its fraction of missing values.
+        chunksize : int, optional
+            Maximum number of rows per chunk.
+        nan_fraction : float, optional
+            Default fraction of missing values per column.
+        seed : int or numpy.random.SeedSequence, optional
+            Seed for reproducible chunks.
+        max_workers : int, optional
+            Generate chunks on a process pool with this many workers.
+
+        Yields
+        ------
+        `pandas.core.frame.DataFrame`
+            Chunks of at most `chunksize` rows, numbered continuously.
+        """
+        if chunksize < 1:
+            raise ValueError("chunksize must be a positive integer")
+        specs = _column_specs(schema, nan_fraction)
+        seeds = seed if isinstance(seed, np.random.SeedSequence) else None
+        seeds = seeds or np.random.SeedSequence(seed)
+        # The children of `seeds.spawn`, derived from the chunk number instead of
+        # spawned, which would change the caller's SeedSequence between calls.
+        tasks = (
+            (
+                specs,
+                min(chunksize, rows - offset),
+                offset,
+                np.random.SeedSequence(
+                    seeds.entropy,
+                    spawn_key=seeds.spawn_key + (i,),
+                    pool_size=seeds.pool_size,
+                ),
+            )
+            for i, offset in enumerate(range(0, rows, chunksize))
+        )
+        if not max_workers or max_workers < 2:
+            for task in tasks:
+                yield _random_chunk(task)
+            return
+
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            pending = []
+            for task in tasks:
+                pending.append(executor.submit(_random_chunk, task))
+                if len(pending) > max_workers:
+                    yield pending.pop(0).result()
+            for future in pending:
+                yield future.result()
+
+    @staticmethod
+    def write_random_df(path, rows, schema, chunksize=1000000, **kwargs):
+        """Stream a random frame of a mixed schema to a csv file
+
+        Chunks are appended as they are generated, so the size of the file is not
+        limited by memory.
+
+        Parameters
+        ----------
+        path : str
+            Destination csv file, overwritten if it exists.
+        rows : int
+            Total number of rows.
+        schema : dict
+            Column types, see `generate_random_df`.
+        chunksize : int, optional
+            Maximum number of rows per chunk.
+        **kwargs
+            Keyword arguments of `generate_random_df`, e.g. `seed` or `max_workers`.
+
+        Returns
+        -------
+        str
+            The written `path`.
+        """
+        header = True
+        with open(path, "w", newline="") as f:
+            for chunk in PandasUtilities.generate_random_df(
+                rows, schema, chunksize=chunksize, **kwargs
+            ):
+                chunk.to_csv(f, header=header, index=False)
+                header = False
+            if header:
+                pd.DataFrame(columns=list(schema)).to_csv(f, index=False)
+        return path
 
     @staticmethod
-    def rename_cols(df, new_names=[], prefix=None, suffix=None):
+    def rename_cols(
+        df, new_names=[], prefix=None, suffix=None, inplace=False, copy=False
+    ):
         """Rename column names as well as add prefix and suffix
 
+        Only the column labels change, the data is shared with `df` unless `copy`.
+        For backwards compatibility `new_names` are always set on `df` itself.
+
         Parameters
         ----------
         df : pandas.core.frame.DataFrame
@@ -55,24 +2690,28 @@ class PandasUtilities:
             Add prefix on column name
         suffix : None, optional
             Add suffix on column name
+        inplace : bool, optional
+            Rename the columns of `df` and return None.
+        copy : bool, optional
+            Return a frame with its own copy of the data.
 
         Returns
         -------
         `pandas.core.frame.DataFrame`
             DataFrame with new column names.
         """
-
+        columns = _renamed_columns(df.columns, new_names, prefix, suffix)
+        if inplace:
+            df.columns = columns
+            return None
         if new_names and (len(df.columns) == len(new_names)):
-            df.columns = new_names
-            df.columns = df.columns.str.replace(" ", "_")
-        if prefix:
-            df = df.add_prefix(prefix)
-        if suffix:
-            df = df.add_suffix(suffix)
+            df.columns = _renamed_columns(df.columns, new_names)
+        df = df.copy(deep=copy)
+        df.columns = columns
         return df
 
     @staticmethod
-    def reverse_row_order(df, reset_index=False):
+    def reverse_row_order(df, reset_index=False, copy=False):
         """Reverse the order of the dataframe, and reset the indices (optional)
 
         Parameters
@@ -82,30 +2721,39 @@ class PandasUtilities:
             potentially heterogeneous tabular data
         reset_index : bool, optional
             Reset the index of the DataFrame to start at '0'
+        copy : bool, optional
+            Return a frame with its own copy of the data, by default the result
+            is a view on the data of `df`.
 
         Returns
         -------
         `pandas.core.frame.DataFrame`
             Reversed order of rows in DataFrame
         """
-        return df.loc[::-1].reset_index(drop=True) if reset_index else df.loc[::-1]
+        reversed_df = df.iloc[::-1].copy(deep=copy)
+        if reset_index:
+            reversed_df.index = pd.RangeIndex(len(reversed_df))
+        return reversed_df
 
     @staticmethod
-    def reverse_col_order(df):
-        """Summary
+    def reverse_col_order(df, copy=False):
+        """Reverse the order of the columns
 
         Parameters
         ----------
         df : pandas.core.frame.DataFrame
             Two-dimensional size-mutable,
             potentially heterogeneous tabular data
+        copy : bool, optional
+            Return a frame with its own copy of the data, by default the result
+            is a view on the data of `df`.
 
         Returns
         -------
         `pandas.core.frame.DataFrame`
             Reversed order of cols in DataFrame
         """
-        return df.loc[:, ::-1]
+        return df.iloc[:, ::-1].copy(deep=copy)
 
     @staticmethod
     def select_by_datatype(df, include_datatype=[], exclude_datatype=[]):
@@ -133,9 +2781,177 @@ class PandasUtilities:
         )
 
     @staticmethod
-    def build_df_from_csvs(csv_files, axis, ignore_index=True):
+    def lazy(df):
+        """Start a lazy pipeline of filters, column selections and renames
+
+        Parameters
+        ----------
+        df : pandas.core.frame.DataFrame
+            Two-dimensional size-mutable,
+            potentially heterogeneous tabular data
+
+        Returns
+        -------
+        `LazyFrame`
+            Chain `remove_rows_with_nan`, `filter_by_multiple_categories`,
+            `select_by_datatype` and `rename_cols`, then call `collect`.
+        """
+        return LazyFrame(df)
+
+    @staticmethod
+    def optimize_memory(df, category_threshold=0.5, date_format=None):
+        """Shrink a DataFrame by picking the smallest safe dtype for every column
+
+        Integers are downcast to the smallest (unsigned) width that holds their
+        range, floats to float32 when that is lossless, datetime-like strings are
+        parsed with `col_to_datetime` and low-cardinality strings become
+        `category`.
+
+        Parameters
+        ----------
+        df : pandas.core.frame.DataFrame
+            Two-dimensional size-mutable,
+            potentially heterogeneous tabular data
+        category_threshold : float, optional
+            Convert string columns whose ratio of unique values to rows is below
+            this threshold to `category`.
+        date_format : str, optional
+            Format of datetime-like strings, string columns are not checked for
+            dates when omitted.
+
+        Returns
+        -------
+        tuple
+            The optimized DataFrame, a report of `memory_usage(deep=True)` in bytes
+            before/after per column and a dtype map of the columns converted to
+            category or datetime. The dtype map can be passed as `dtype` to
+            `build_df_from_csvs` so later reads skip the inference. The narrowed
+            numeric widths are left out, later files may not fit their ranges and
+            `pandas.read_csv` would wrap the values around silently.
+        """
+        before = df.memory_usage(deep=True)
+        columns = {}
+        dtype_map = {}
+        for column_name in df.columns:
+            col = df[column_name]
+            dtype = col.dtype
+            if is_bool_dtype(dtype):
+                pass
+            elif is_integer_dtype(dtype) and isinstance(dtype, np.dtype):
+                downcast = "unsigned" if len(col) and col.min() >= 0 else "integer"
+                col = pd.to_numeric(col, downcast=downcast)
+            elif is_float_dtype(dtype) and isinstance(dtype, np.dtype):
+                values = col.to_numpy()
+                as_float32 = values.astype(np.float32)
+                lossless = (as_float32 == values) | np.isnan(values)
+                if dtype.itemsize > 4 and lossless.all():
+                    col = col.astype(np.float32)
+            elif is_object_dtype(dtype) or is_string_dtype(dtype):
+                if date_format is not None:
+                    try:
+                        col = PandasUtilities.col_to_datetime(
+                            df, column_name, date_format=date_format
+                        )
+                    except (TypeError, ValueError):
+                        pass
+                if col.dtype == dtype and len(col):
+                    if col.nunique() / len(col) < category_threshold:
+                        col = col.astype("category")
+            if isinstance(col.dtype, pd.CategoricalDtype) and col.dtype != dtype:
+                # Plain 'category' lets later reads pick up unseen categories.
+                dtype_map[column_name] = "category"
+            elif is_datetime64_any_dtype(col.dtype) and col.dtype != dtype:
+                dtype_map[column_name] = col.dtype
+            columns[column_name] = col
+
+        optimized = pd.DataFrame(columns, index=df.index)
+        report = pd.DataFrame(
+            {"before": before, "after": optimized.memory_usage(deep=True)}
+        )
+        return optimized, report, dtype_map
+
+    @staticmethod
+    def infer_csv_schema(
+        csv_files,
+        sample_rows=10000,
+        usecols=None,
+        category_threshold=0.5,
+        max_workers=None,
+    ):
+        """Infer one dtype per column that fits every csv file
+
+        The heads of the files are sampled concurrently and their types unified:
+        whole numbers become 'int64', or nullable 'Int64' when a file has NaN's,
+        mixed ints and floats 'float64', booleans 'bool' or 'boolean', ISO dates
+        'datetime64[ns]' and strings with few distinct values 'category'.
+        Columns whose types cannot be unified, or that some files lack, are
+        reported instead. When a file is longer than the sample, its ints and
+        bools get the nullable dtypes and whole-number floats stay 'float64'.
+
+        Parameters
+        ----------
+        csv_files : list
+            List of csv files
+        sample_rows : int, optional
+            Rows sampled from the head of every file.
+        usecols : list, optional
+            Columns to read, either shared by all files or a list with one entry
+            per file.
+        category_threshold : float, optional
+            Strings become 'category' when at most this fraction of the sampled
+            values is distinct.
+        max_workers : int, optional
+            Number of threads sampling the files.
+
+        Returns
+        -------
+        tuple
+            The dtypes, a dict to pass as `dtype` to `build_df_from_csvs`, and a
+            DataFrame with the sampled type of every mismatching column (rows) in
+            every file (columns), NaN where a file lacks the column.
+        """
+        jobs = _read_jobs(csv_files, usecols=usecols)
+        # One extra row tells whether a sample is the whole file.
+        tasks = [(file, options, sample_rows + 1) for file, options in jobs]
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            samples = list(executor.map(_sample_csv, tasks))
+        complete = [len(sample) <= sample_rows for sample in samples]
+        samples = [sample.head(sample_rows) for sample in samples]
+        dtype, kinds = _unify_schema(samples, complete, category_threshold)
+        mismatches = {}
+        for column, file_kinds in kinds.items():
+            found = set(file_kinds) - {"empty"}
+            if None in found or (len(found) > 1 and found != {"int", "float"}):
+                mismatches[column] = file_kinds
+        mismatches = pd.DataFrame.from_dict(
+            mismatches, orient="index", columns=[file for file, _ in jobs]
+        )
+        return dtype, mismatches
+
+    @staticmethod
+    def build_df_from_csvs(
+        csv_files,
+        axis,
+        ignore_index=True,
+        parallel=False,
+        max_workers=None,
+        executor="thread",
+        dtype=None,
+        usecols=None,
+        cache=None,
+        strict=False,
+        include_datatype=None,
+        exclude_datatype=None,
+        filters=None,
+        chunksize=100000,
+    ):
         """Build a DataFrame from multiple files (row-wise)
 
+        Column selections and row `filters` are pushed down into the reader: only
+        the selected columns are parsed, and the files are read `chunksize` rows
+        at a time keeping just the matching rows, so memory scales with the
+        output rather than the input.
+
         Parameters
         ----------
         csv_files : list
@@ -144,42 +2960,407 @@ class PandasUtilities:
             Concatenate csv files according to columns or rows.
         ignore_index : bool, optional
             Resets indices
+        parallel : bool, optional
+            Read the files concurrently, the result is identical (and in the same
+            order) as the sequential read.
+        max_workers : int, optional
+            Number of workers in the pool, defaults to the executor's default.
+        executor : str, optional
+            Either 'thread' or 'process'.
+        dtype : dict, list or 'infer', optional
+            Data-type hints passed to `pandas.read_csv`, either shared by all files
+            or a list with one entry per file. 'infer' applies the schema of
+            `infer_csv_schema` to every file.
+        usecols : list, optional
+            Columns to read, either shared by all files or a list with one entry
+            per file.
+        cache : CsvCache, optional
+            Serve files that were parsed before from this cache.
+        strict : bool, optional
+            With `dtype='infer'`, raise instead of warn when the files disagree on
+            the type of a column, or when the rows past the sampled heads do not
+            fit the inferred dtypes (the files are otherwise read without them).
+        include_datatype : list, optional
+            Only read the columns of these data-types, as `select_by_datatype`.
+            The types are resolved on the head of every file.
+        exclude_datatype : list, optional
+            Do not read the columns of these data-types.
+        filters : list, optional
+            Only keep the rows matching all of these (column, predicate[, value])
+            tuples:
+
+            - ('genre', 'isin', ['Rock', 'Jazz']) and ('genre', 'notin', [...])
+            - ('price', 'notna')
+            - ('price', 'between', (low, high)), bounds included
+        chunksize : int, optional
+            Rows parsed at a time when filtering.
 
         Returns
         -------
         `pandas.core.frame.DataFrame`
             DataFrame containing data from CSV files(s)
+
+        Raises
+        ------
+        ValueError
+            If `strict` and the column types of the files cannot be unified or
+            do not fit the files, or on a malformed filter.
         """
-        return pd.concat(
-            (pd.read_csv(file) for file in csv_files),
-            axis=axis,
-            ignore_index=ignore_index,
-        )
+        csv_files = list(csv_files)
+        if parallel and executor not in ("thread", "process"):
+            raise ValueError(
+                "executor must be 'thread' or 'process', got {!r}".format(executor)
+            )
+        inferred = isinstance(dtype, str) and dtype == "infer"
+        if inferred:
+            dtype, mismatches = PandasUtilities.infer_csv_schema(
+                csv_files, usecols=usecols, max_workers=max_workers
+            )
+            if len(mismatches):
+                message = "Column types differ between the csv files:\n{}".format(
+                    mismatches.to_string()
+                )
+                if strict:
+                    raise ValueError(message)
+                warnings.warn(message, stacklevel=2)
+        filters = _check_filters(filters)
+        jobs = _read_jobs(csv_files, dtype=dtype, usecols=usecols)
+        if include_datatype or exclude_datatype:
+            jobs = _select_columns(
+                jobs, include_datatype, exclude_datatype, max_workers=max_workers
+            )
+        read_csv = partial(_read_csv, cache=cache, filters=filters, chunksize=chunksize)
+        pool = None
+        if parallel and len(jobs) > 1:
+            pool = ThreadPoolExecutor if executor == "thread" else ProcessPoolExecutor
+        try:
+            frames = _read_all(read_csv, jobs, pool, max_workers)
+        except (TypeError, ValueError) as error:
+            if not inferred:
+                raise
+            # The schema was inferred on the heads, the rest of a file may not fit.
+            message = "The inferred dtypes do not fit the csv files ({}), read them "
+            message = message.format(error) + "without dtypes instead"
+            if strict:
+                raise ValueError(message) from error
+            warnings.warn(message, stacklevel=2)
+            jobs = [
+                (
+                    file,
+                    {
+                        key: value
+                        for key, value in options.items()
+                        if key not in ("dtype", "parse_dates")
+                    },
+                )
+                for file, options in jobs
+            ]
+            frames = _read_all(read_csv, jobs, pool, max_workers)
+        if axis in (0, "index") and len(frames) > 1:
+            frames = _union_categories(frames)
+
+        # Hand concat a materialised list so it can size the output blocks upfront
+        # and copy every frame exactly once.
+        return pd.concat(frames, axis=axis, ignore_index=ignore_index)
+
+    @staticmethod
+    def stream_df_from_csvs(
+        csv_files,
+        chunksize=100000,
+        usecols=None,
+        dtype=None,
+        ignore_index=True,
+        filters=None,
+    ):
+        """Lazily read multiple csv files as a stream of bounded-size DataFrames
+
+        Only one chunk is held in memory at a time, which makes it possible to
+        process inputs larger than RAM. Every chunk is a regular DataFrame and can
+        be passed through any of the other filters, e.g.
+        `filter_by_multiple_categories` or `remove_rows_with_nan`.
+
+        Parameters
+        ----------
+        csv_files : list
+            List of csv files
+        chunksize : int, optional
+            Maximum number of rows per chunk.
+        usecols : list, optional
+            Columns to read, either shared by all files or a list with one entry
+            per file.
+        dtype : dict or list, optional
+            Data-type hints passed to `pandas.read_csv`, either shared by all files
+            or a list with one entry per file.
+        ignore_index : bool, optional
+            Number the rows continuously across chunks and files, as
+            `build_df_from_csvs` does.
+        filters : list, optional
+            Only yield the rows matching all of these row filters, see
+            `build_df_from_csvs`. Chunks can then be smaller than `chunksize`.
+
+        Yields
+        ------
+        `pandas.core.frame.DataFrame`
+            Chunks of at most `chunksize` rows, in file order.
+        """
+        if chunksize < 1:
+            raise ValueError("chunksize must be a positive integer")
+        filters = _check_filters(filters)
+        offset = 0
+        for file, read_options in _read_jobs(csv_files, dtype=dtype, usecols=usecols):
+            usecols, read_options = _with_filter_columns(read_options, filters)
+            with pd.read_csv(file, chunksize=chunksize, **read_options) as reader:
+                for chunk in reader:
+                    if filters:
+                        chunk = _filter_rows(chunk, filters)
+                        if usecols is not None:
+                            chunk = chunk.loc[:, chunk.columns.isin(usecols)]
+                    if ignore_index:
+                        chunk.index = pd.RangeIndex(offset, offset + len(chunk))
+                        offset += len(chunk)
+                    yield chunk
+
+    @staticmethod
+    def parallel_apply(
+        df, operation, column_name, n_partitions=None, max_workers=None, **kwargs
+    ):
+        """Run a row-local operation on row partitions of a DataFrame in parallel
+
+        The operation's column is split into `n_partitions` row ranges which are
+        processed on a process pool. Numeric columns are placed in shared memory
+        once instead of being pickled to every worker, and filters send back row
+        positions only.
+
+        Parameters
+        ----------
+        df : pandas.core.frame.DataFrame
+            Two-dimensional size-mutable,
+            potentially heterogeneous tabular data
+        operation : str
+            One of `ROW_LOCAL_OPERATIONS`, e.g. 'filter_by_multiple_categories'.
+        column_name : str or list
+            Column the operation works on, a list for `remove_rows_with_nan`.
+            The columns of a list are pickled to the workers.
+        n_partitions : int, optional
+            Number of row partitions, defaults to `max_workers`.
+        max_workers : int, optional
+            Number of worker processes, defaults to the number of CPUs.
+        **kwargs
+            Keyword arguments of the operation, e.g. `filter_by`.
+
+        Returns
+        -------
+        `pandas.core.frame.DataFrame` or `pandas.Series`
+            Same result as calling the operation on `df` directly, counts such
+            as the failures of `col_to_datetime(report=True)` are summed over
+            the partitions.
+        """
+        if operation not in ROW_LOCAL_OPERATIONS:
+            raise ValueError(
+                "operation must be one of {}, got {!r}".format(
+                    ROW_LOCAL_OPERATIONS, operation
+                )
+            )
+        max_workers = max_workers or os.cpu_count() or 1
+        n_partitions = max(1, min(n_partitions or max_workers, len(df)))
+        if len(df) == 0:
+            return getattr(PandasUtilities, operation)(df, column_name, **kwargs)
+
+        col = df[column_name]
+        if operation == "continous_to_categorical_data":
+            kwargs = _global_bins(col, kwargs)
+        bounds = np.linspace(0, len(df), n_partitions + 1).astype(np.intp)
+        shm = None
+        try:
+            if isinstance(col, pd.DataFrame):
+                blocks = [col.iloc[start:stop] for start, stop in zip(bounds, bounds[1:])]
+            elif isinstance(col.dtype, np.dtype) and col.dtype.kind in "biufmM":
+                values = col.to_numpy()
+                shm = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+                np.ndarray(len(values), dtype=values.dtype, buffer=shm.buf)[:] = values
+                block = _SharedBlock(shm.name, values.dtype.str, len(values))
+                blocks = [block] * n_partitions
+            else:
+                blocks = [col.iloc[start:stop] for start, stop in zip(bounds, bounds[1:])]
+            tasks = [
+                (operation, column_name, block, start, stop, kwargs)
+                for block, start, stop in zip(blocks, bounds, bounds[1:])
+            ]
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                results = list(executor.map(_run_partition, tasks))
+        finally:
+            if shm is not None:
+                shm.close()
+                shm.unlink()
+
+        if isinstance(results[0], np.ndarray):
+            return df.iloc[np.concatenate(results)]
+        counts = None
+        if isinstance(results[0], tuple):
+            results, counts = zip(*results)
+        result = pd.concat(results)
+        result.index = df.index
+        if counts is not None:
+            return result, sum(counts)
+        return result
 
     @staticmethod
-    def split_df_into_subsets(df, fraction=0.5, random_state=1234):
-        """Return a random sample of items from an axis of object.
+    def split_df_into_subsets(
+        df, fraction=0.5, random_state=1234, stratify=None, return_indices=False
+    ):
+        """Randomly split a DataFrame into subsets by row position
+
+        The rows are permuted once and the permutation is sliced, so the split
+        works with duplicated index labels. Each fraction takes a subset in random
+        order (the first one matches `df.sample(frac=fraction)`), the last subset
+        holds the remaining rows in their original order.
 
         Parameters
         ----------
         df : pandas.core.frame.DataFrame
             Two-dimensional size-mutable,
             potentially heterogeneous tabular data
-        fraction : float, optional
-            Fraction of axis items to return.
-            Cannot be used with `n`.
+        fraction : float or list, optional
+            Fraction of rows of each subset, a list of k fractions gives a k+1-way
+            split.
         random_state : int or numpy.random.RandomState, optional
             Seed for the random number generator (if int),
             or numpy RandomState object.
+        stratify : str, optional
+            Split every category of this column by the same fractions.
+        return_indices : bool, optional
+            Return arrays of row positions instead of DataFrames, to be taken
+            lazily with `df.iloc`.
+
+        Returns
+        -------
+        tuple
+            DataFrames (or row positions) of every subset
+        """
+        fractions = np.atleast_1d(np.asarray(fraction, dtype=np.float64))
+        if np.any(fractions < 0) or fractions.sum() > 1:
+            raise ValueError("fractions must be positive and add up to at most 1")
+        if not isinstance(random_state, np.random.RandomState):
+            random_state = np.random.RandomState(random_state)
+        permutation = random_state.permutation(len(df))
+
+        if stratify is None:
+            # Rounding the cumulative bounds keeps the sizes from drifting.
+            bounds = np.round(np.cumsum(fractions) * len(df)).astype(np.intp)
+            subsets = np.split(permutation, np.minimum(bounds, len(df)))
+        else:
+            codes, _ = pd.factorize(df[stratify], use_na_sentinel=False)
+            # Rank of every row within its category, in permuted order.
+            order = permutation[np.argsort(codes[permutation], kind="stable")]
+            sizes = np.bincount(codes)
+            starts = np.cumsum(sizes) - sizes
+            ranks = np.arange(len(df)) - np.repeat(starts, sizes)
+            bounds = np.round(np.cumsum(np.outer(sizes, fractions), axis=1))
+            subset_ids = np.empty(len(df), dtype=np.intp)
+            subset_ids[order] = (
+                ranks[:, None] >= bounds[np.repeat(np.arange(len(sizes)), sizes)]
+            ).sum(axis=1)
+            permuted_ids = subset_ids[permutation]
+            subsets = [
+                permutation[permuted_ids == i] for i in range(len(fractions) + 1)
+            ]
+        subsets[-1] = np.sort(subsets[-1])
+
+        if return_indices:
+            return tuple(subsets)
+        return tuple(df.iloc[positions] for positions in subsets)
+
+    @staticmethod
+    def build_join_index(reference, on, columns=None, method="hash"):
+        """Index a reference table once for repeated lookup joins
+
+        Parameters
+        ----------
+        reference : pandas.core.frame.DataFrame
+            Reference (dimension) table with unique keys.
+        on : str or list
+            Key column(s) of `reference`.
+        columns : list, optional
+            Reference columns to join, all non-key columns by default.
+        method : str, optional
+            'hash' or 'sorted', see `JoinIndex`.
+
+        Returns
+        -------
+        JoinIndex
+            Index to pass to `join_by_index`
+
+        Raises
+        ------
+        ValueError
+            If the keys of `reference` are not unique.
+        """
+        return JoinIndex(reference, on, columns=columns, method=method)
+
+    @staticmethod
+    def join_by_index(df, join_index, on=None, how="left", suffixes=("_x", "_y")):
+        """Enrich a frame, or a stream of frames, with the columns of a reference
+
+        Like `df.merge(reference, how=how, validate='many_to_one')`, except that the
+        index and row order of `df` are kept and the reference keys are not
+        repeated.
+
+        Parameters
+        ----------
+        df : pandas.core.frame.DataFrame or iterable
+            Fact frame, or an iterable of fact frames to join chunk by chunk.
+        join_index : JoinIndex
+            Index of the reference table, from `build_join_index`.
+        on : str or list, optional
+            Key column(s) of `df`, the reference key names by default.
+        how : str, optional
+            'left' or 'inner'.
+        suffixes : tuple, optional
+            Appended to the fact and reference names of overlapping columns.
+
+        Returns
+        -------
+        `pandas.core.frame.DataFrame` or generator
+            The joined frame, or a generator of joined chunks.
+        """
+        if isinstance(df, pd.DataFrame):
+            return join_index.join(df, on=on, how=how, suffixes=suffixes)
+        return join_index.join_chunks(df, on=on, how=how, suffixes=suffixes)
+
+    @staticmethod
+    def build_column_index(df, column_name):
+        """Index a column for repeated filtering
+
+        Once built, `filter_by_multiple_categories` and `remove_rows_with_nan` use
+        the index for `df[column_name]` until it is invalidated or evicted.
+
+        Parameters
+        ----------
+        df : pandas.core.frame.DataFrame
+            Two-dimensional size-mutable,
+            potentially heterogeneous tabular data
+        column_name : str
+            Column name to index
 
         Returns
         -------
-        List
-            List of data frame
+        ColumnIndex
+            Index of the column
+        """
+        return PandasUtilities.column_indexes.build(df, column_name)
+
+    @staticmethod
+    def invalidate_column_index(df=None, column_name=None):
+        """Drop column indexes, e.g. after modifying a DataFrame in place
+
+        Parameters
+        ----------
+        df : pandas.core.frame.DataFrame, optional
+            Only drop the indexes of this DataFrame
+        column_name : str, optional
+            Only drop the indexes of this column
         """
-        df_1 = df.sample(frac=fraction, random_state=random_state)
-        df_2 = df.drop(df_1.index)
-        return df_1, df_2
+        PandasUtilities.column_indexes.invalidate(df, column_name)
 
     @staticmethod
     def filter_by_multiple_categories(df, column_name, filter_by=[], exclude=False):
@@ -192,8 +3373,9 @@ class PandasUtilities:
             potentially heterogeneous tabular data
         column_name : str
             Column name to filter
-        filter_by : list, optional
-            List of categories to filter
+        filter_by : list or CategoryFilter, optional
+            List of categories to filter, pass a `CategoryFilter` when the same
+            categories are used repeatedly.
         exclude : bool, optional
             Exclude the filter
 
@@ -207,13 +3389,25 @@ class PandasUtilities:
         head : bool, optional
             Only show head of the data frame
         """
-        _filtered = df[column_name].isin(filter_by)
-        return df[_filtered] if not exclude else df[~_filtered]
+        index = PandasUtilities.column_indexes.get(df, column_name)
+        if index is not None and not exclude:
+            return df.iloc[index.positions(filter_by)]
+        return df[_category_mask(df, column_name, filter_by, exclude)]
 
     @staticmethod
-    def filter_by_large_categories(df, column_name, count=3):
+    def filter_by_large_categories(
+        df, column_name, count=3, return_counts=False, sketch=None
+    ):
         """Filter a DataFrame by largest categories
 
+        The column is hashed once with `pandas.factorize`, the categories are
+        counted with `numpy.bincount` and the mask is a lookup of the codes. Ties
+        are broken by order of first appearance, NaN's are never selected.
+
+        With a `sketch` the largest categories are those of the whole stream
+        it was built from (see `sketch_categories`) instead of those of `df`,
+        so every chunk of a stream is filtered by the same categories.
+
         Parameters
         ----------
         df : pandas.core.frame.DataFrame
@@ -223,21 +3417,126 @@ class PandasUtilities:
             Column name to filter
         count : int, optional
             Number of largest values in the Series
+        return_counts : bool, optional
+            Also return the number of rows of each selected category.
+        sketch : CountMinSketch, optional
+            Approximate counts of the column over a stream.
 
         Returns
         -------
         `pandas.core.frame.DataFrame`
-            DataFrame containing included/excluded
-            data-types
+            DataFrame containing the rows of the largest categories, and a
+            `pandas.Series` of counts by category (largest first) when
+            `return_counts` is set, estimated ones with a `sketch`.
+        """
+        if sketch is not None:
+            counts = sketch.top(count).rename_axis(column_name)
+            filtered = df[_category_mask(df, column_name, counts.index)]
+            return (filtered, counts) if return_counts else filtered
+        codes, uniques = pd.factorize(df[column_name])
+        # Shift by one so that NaN's (code -1) land in bin 0 and drop out.
+        counts = np.bincount(codes + 1, minlength=len(uniques) + 1)[1:]
+        top = _top_k(counts, count)
+        keep = np.zeros(len(uniques) + 1, dtype=bool)
+        keep[top] = True
+        filtered = df[keep[codes]]
+        if return_counts:
+            index = pd.Index(uniques.take(top), name=column_name)
+            return filtered, pd.Series(counts[top], index=index, name="count")
+        return filtered
 
-        Deleted Parameters
-        ------------------
-        head : bool, optional
-            Only show head of the data frame
+    @staticmethod
+    def sketch_categories(
+        data, column_name, epsilon=0.001, delta=0.01, capacity=1000, error=0.01
+    ):
+        """Approximate category counts and distinct count of a stream
+
+        Builds a `CountMinSketch` and a `HyperLogLog` of the column chunk by
+        chunk, in memory bounded by the error parameters. Sketches of shards
+        built by different workers can be combined with their `merge` method.
+
+        Parameters
+        ----------
+        data : pandas.core.frame.DataFrame or iterable
+            DataFrame or chunks of DataFrames, e.g. from `stream_df_from_csvs`
+        column_name : str
+            Column name to sketch
+        epsilon, delta : float, optional
+            Error of the counts, see `CountMinSketch`.
+        capacity : int, optional
+            Number of top-k candidates kept by the `CountMinSketch`.
+        error : float, optional
+            Relative error of the distinct count, see `HyperLogLog`.
+
+        Returns
+        -------
+        tuple
+            `CountMinSketch` and `HyperLogLog` of the column
+        """
+        counts = CountMinSketch(epsilon, delta, capacity)
+        distinct = HyperLogLog(error)
+        chunks = [data] if isinstance(data, pd.DataFrame) else data
+        for chunk in chunks:
+            hashed = _hashed_counts(chunk[column_name])
+            counts._add(*hashed)
+            distinct._add(*hashed)
+        return counts, distinct
+
+    @staticmethod
+    def hash_rows(df, subset=None):
+        """64-bit hash of every row
+
+        Columns are hashed one at a time and combined, so no row-wise copy of a
+        wide frame is made. Equal rows have equal hashes, -0.0 and 0.0 being
+        equal as in `drop_duplicates`.
+
+        Parameters
+        ----------
+        df : pandas.core.frame.DataFrame
+            Two-dimensional size-mutable,
+            potentially heterogeneous tabular data
+        subset : list, optional
+            Columns to hash, all columns by default.
+
+        Returns
+        -------
+        `pandas.Series`
+            uint64 hashes, indexed like `df`
+        """
+        data = df if subset is None else df[subset]
+        return pd.Series(_row_hashes(data), index=df.index)
+
+    @staticmethod
+    def drop_duplicate_rows(df, subset=None, verify=False, tracker=None):
+        """Remove duplicate rows of a frame, or of a stream of frames
+
+        Like `df.drop_duplicates(subset)`, but rows are compared by their
+        `hash_rows` and only a sorted set of hashes is kept, so a stream, e.g.
+        from `stream_df_from_csvs`, is deduplicated across chunks out of core.
+
+        Parameters
+        ----------
+        df : pandas.core.frame.DataFrame or iterable
+            Frame, or an iterable of frames to deduplicate chunk by chunk.
+        subset : list, optional
+            Columns identifying a row, all columns by default.
+        verify : bool, optional
+            Compare the rows of equal hashes, see `DuplicateTracker`.
+        tracker : DuplicateTracker, optional
+            Tracker to update, e.g. to read the duplicate counts afterwards or
+            to continue a previous stream. A new one by default.
+
+        Returns
+        -------
+        `pandas.core.frame.DataFrame` or generator
+            The frame without duplicates, or a generator of chunks without
+            duplicates.
         """
-        counts = df[column_name].value_counts()
-        _filtered = df[column_name].isin(counts.nlargest(count).index)
-        return df[_filtered]
+        if tracker is None:
+            tracker = DuplicateTracker(subset, verify)
+        if isinstance(df, pd.DataFrame):
+            return tracker.drop_duplicates(df)
+        return tracker.drop_duplicates_chunks(df)
 
     @staticmethod
     def drop_cols_with_NaNs(df, threshold=0.1):
@@ -257,22 +3556,82 @@ class PandasUtilities:
         `pandas.core.frame.DataFrame`
             DataFrame without NaN's
         """
+        profile = PandasUtilities.null_profiles.get(df)
+        if profile is not None:
+            return df.iloc[:, ~profile.sparse_columns(threshold)]
         return df.dropna(thresh=len(df) * threshold, axis="columns")
 
     @staticmethod
-    def aggregate_by_functions(df, column_name, group_by, functions=["sum", "count"]):
+    def null_profile(df, block_rows=None):
+        """Profile the NaN's of a DataFrame once, for repeated null checks
+
+        Until `df` is invalidated or evicted, `drop_cols_with_NaNs` and
+        `remove_rows_with_nan` answer from the profile instead of scanning `df`.
+        The profile's `report` gives the NaN count and fraction of every column.
+
+        Parameters
+        ----------
+        df : pandas.core.frame.DataFrame
+            Two-dimensional size-mutable,
+            potentially heterogeneous tabular data
+        block_rows : int, optional
+            Rows profiled at a time.
+
+        Returns
+        -------
+        NullProfile
+            The registered profile of `df`
+        """
+        profile = PandasUtilities.null_profiles.get(df)
+        if profile is None:
+            profile = PandasUtilities.null_profiles.build(df, block_rows)
+        return profile
+
+    @staticmethod
+    def invalidate_null_profile(df=None):
+        """Drop null profiles, e.g. after modifying a DataFrame in place
+
+        Parameters
+        ----------
+        df : pandas.core.frame.DataFrame, optional
+            Only drop the profile of this DataFrame
+        """
+        PandasUtilities.null_profiles.invalidate(df)
+
+    @staticmethod
+    def aggregate_by_functions(
+        df,
+        column_name,
+        group_by,
+        functions=["sum", "count"],
+        sort=False,
+        observed=True,
+        presorted=None,
+    ):
         """Aggregate by multiple functions
 
+        When the frame is already sorted by a single `group_by` column, the groups
+        are contiguous segments and sum/count/min/max/mean/size are reduced with
+        `numpy.ufunc.reduceat` instead of the hash-based groupby.
+
         Parameters
         ----------
         df : pandas.core.frame.DataFrame
             Two-dimensional size-mutable,
             potentially heterogeneous tabular data
-        column_name : TYPE
-        group_by : TYPE
-            Description
-        functions : list, optional
-            Description
+        column_name : str or list
+            Column(s) to aggregate, ignored when `functions` holds named outputs.
+        group_by : str or list
+            Column(s) to group by
+        functions : list or dict, optional
+            Functions applied to every column, or named outputs as a dict of
+            `{output_name: (column_name, function)}`.
+        sort : bool, optional
+            Sort the group keys, groups are in order of first appearance otherwise.
+        observed : bool, optional
+            Only show observed values of categorical keys.
+        presorted : bool, optional
+            Whether `df` is sorted by `group_by`, checked when omitted.
 
         Returns
         -------
@@ -298,11 +3657,26 @@ class PandasUtilities:
                     4 | 21.00 | 2
                     5 | 13.70 | 2
         """
-        return df.groupby(group_by)[column_name].agg(functions)
+        if isinstance(functions, dict):
+            return df.groupby(group_by, sort=sort, observed=observed).agg(**functions)
+
+        if _segment_reducible(df, column_name, group_by, functions):
+            keys = df[group_by]
+            if presorted is None:
+                presorted = keys.is_monotonic_increasing
+            if presorted:
+                return _segment_aggregate(df, column_name, group_by, functions)
+        grouped = df.groupby(group_by, sort=sort, observed=observed)
+        return grouped[column_name].agg(functions)
 
     @staticmethod
-    def continous_to_categorical_data(df, column_name, bins=[], labels=[]):
-        """Summary
+    def continous_to_categorical_data(
+        df, column_name, bins=[], labels=[], include_lowest=False
+    ):
+        """Bin a numeric column into categories
+
+        Bins are assigned with `numpy.searchsorted` on the edges and the result is
+        built directly from the bin codes, the output is the same as `pandas.cut`.
 
         Parameters
         ----------
@@ -310,16 +3684,19 @@ class PandasUtilities:
             Two-dimensional size-mutable,
             potentially heterogeneous tabular data
         column_name : str
-            Description
+            Column to bin
         bins : list
-            Description
+            Bin edges, e.g. from `fit_quantile_bins`, or the number of equal-width
+            bins.
         labels : list
-            Description
+            Labels of the bins, the bins are labelled by their intervals if empty.
+        include_lowest : bool, optional
+            Whether the first interval should be left-inclusive.
 
         Returns
         -------
-        TYPE
-            Description
+        `pandas.Series`
+            Categorical column, NaN for values outside the bins
 
         Example
         -------
@@ -355,7 +3732,39 @@ class PandasUtilities:
         # Ages 0 to 18 were assigned the label "child", ages 18 to 25 were assigned the
         # label "young adult", and ages 25 to 99 were assigned the label "adult".
         """
-        return pd.cut(df[column_name], bins=bins, labels=labels)
+        if labels is not None and labels is not False and not len(labels):
+            labels = None
+        if np.ndim(bins) == 0 or isinstance(bins, pd.IntervalIndex) or labels is False:
+            return pd.cut(
+                df[column_name], bins=bins, labels=labels, include_lowest=include_lowest
+            )
+        return _cut(
+            df[column_name], bins, labels=labels, include_lowest=include_lowest
+        )
+
+    @staticmethod
+    def fit_quantile_bins(df, column_name, q=4):
+        """Fit quantile bin edges once, to be reused on later batches
+
+        Parameters
+        ----------
+        df : pandas.core.frame.DataFrame
+            Two-dimensional size-mutable,
+            potentially heterogeneous tabular data
+        column_name : str
+            Column to fit the bins on
+        q : int or list, optional
+            Number of quantiles, or the quantiles themselves, e.g. [0, .5, 1].
+
+        Returns
+        -------
+        numpy.ndarray
+            Unique bin edges, pass them as `bins` to `continous_to_categorical_data`
+            with `include_lowest=True`.
+        """
+        quantiles = np.linspace(0, 1, q + 1) if np.ndim(q) == 0 else np.asarray(q)
+        values = df[column_name].to_numpy(dtype=np.float64, na_value=np.nan)
+        return np.unique(np.nanquantile(values, quantiles))
 
     @staticmethod
     def change_display_opt(
@@ -380,44 +3789,80 @@ class PandasUtilities:
         return pd.set_option(option, _format) if not reset else pd.reset_option(option)
 
     @staticmethod
-    def remove_rows_with_nan(df, column_name):
+    def remove_rows_with_nan(df, column_name, how="any", min_count=None):
         """Remove all rows containing NaN values
 
+        Uses the registered `null_profile` of `df`, or the column index of a single
+        column, when there is one.
+
         Parameters
         ----------
         df : pandas.core.frame.DataFrame
             Two-dimensional size-mutable,
             potentially heterogeneous tabular data
-        column_name : str
+        column_name : str or list
             Remove all the rows where column_name has NaN values.
+        how : str, optional
+            With several columns, 'any' removes the rows with a NaN in any of
+            them, 'all' the rows with NaN's in all of them.
+        min_count : int, optional
+            Remove the rows with at least `min_count` NaN's, overrides `how`.
 
         Returns
         -------
         `pandas.core.frame.DataFrame`
             DataFrame
         """
-
-        return df[pd.notna(df[column_name])]
+        return df[_notna_mask(df, column_name, how, min_count)]
 
     @staticmethod
-    def col_to_datetime(df, column_name, date_format="%Y-%m-%d"):
-        """
+    def col_to_datetime(
+        df, column_name, date_format="%Y-%m-%d", errors="raise", report=False
+    ):
+        """Convert a column of strings to datetimes
+
+        Every distinct string is parsed once and mapped back onto the rows through
+        its factorize code. The fixed-width ISO formats ('%Y-%m-%d',
+        '%Y-%m-%d %H:%M:%S' and '%Y-%m-%dT%H:%M:%S') are parsed by slicing the
+        string bytes, anything they do not cover goes through `pandas.to_datetime`.
+
         Parameters
         ----------
         df : pandas.core.frame.DataFrame
             Two-dimensional size-mutable,
             potentially heterogeneous tabular data
-        column_name : TYPE
+        column_name : str
             Column to change datetime
         date_format : str, optional
-            Description
+            strftime format of the column
+        errors : str, optional
+            'raise' on the first value that does not match `date_format`, or
+            'coerce' it to NaT.
+        report : bool, optional
+            Also return the number of rows that failed to parse.
 
         Returns
         -------
-        `pandas.core.frame.DataFrame`
-            DataFrame
+        `pandas.Series`
+            Column of datetimes, and the number of non-missing values that ended
+            up as NaT when `report` is set.
         """
-        return pd.to_datetime(df[column_name], format=date_format)
+        if errors not in ("raise", "coerce"):
+            raise ValueError(
+                "errors must be 'raise' or 'coerce', got {!r}".format(errors)
+            )
+        col = df[column_name]
+        codes, uniques = pd.factorize(col)
+        parsed = _parse_datetimes(uniques, date_format, errors)
+        result = pd.Series(
+            parsed.take(codes, allow_fill=True, fill_value=pd.NaT),
+            index=col.index,
+            name=col.name,
+        )
+        if report:
+            failed = np.asarray(parsed.isna())
+            return result, int(failed[codes[codes >= 0]].sum())
+        return result
 
     @staticmethod
     def binning_column_by_group_names(
@@ -445,26 +3890,73 @@ class PandasUtilities:
         Returns:
         --------
         """
-        bins = np.linspace(min(df[column_name]), max(df[column_name]), num_samples)
-        return pd.cut(
-            df[column_name], bins, labels=group_names, include_lowest=include_lowest
+        values = df[column_name].to_numpy(dtype=np.float64, na_value=np.nan)
+        bins = np.linspace(np.nanmin(values), np.nanmax(values), num_samples)
+        return _cut(
+            df[column_name],
+            bins,
+            labels=group_names,
+            include_lowest=include_lowest,
+            uniform=True,
         )
 
     @staticmethod
-    def open_google_sheet(token):
+    def open_google_sheet(token, cache=None, base_url=None, timeout=30, retries=2):
         """Google Spreadsheet CSV into A Pandas Dataframe
 
         Parameters
         ----------
         token : str
             Google Spreadsheet token ID
+        cache : CsvCache, optional
+            Keep the downloaded sheet in this cache and revalidate it with a
+            conditional (ETag/Last-Modified) request, an unchanged sheet is
+            neither downloaded nor parsed again.
+        base_url : str, optional
+            URL template of the sheet export, `GOOGLE_SHEET_URL` by default.
+        timeout : float, optional
+            Timeout of a request in seconds
+        retries : int, optional
+            Number of retries on connection errors and server errors.
 
         Returns
         -------
         `pandas.core.frame.DataFrame`
             DataFrame
         """
-        url = "https://docs.google.com/spreadsheets/d/{}/export?format=csv".format(
-            token
-        )
-        return pd.read_csv(url)
+        url = (base_url or PandasUtilities.GOOGLE_SHEET_URL).format(token)
+        if cache is None:
+            _, body, _ = _fetch(url, timeout=timeout, retries=retries)
+            return pd.read_csv(BytesIO(body))
+        return cache.read_url(url, timeout=timeout, retries=retries)
+
+    @staticmethod
+    def open_google_sheets(tokens, max_workers=8, **kwargs):
+        """Fetch many Google Spreadsheets concurrently
+
+        Parameters
+        ----------
+        tokens : list
+            Google Spreadsheet token IDs
+        max_workers : int, optional
+            Number of concurrent downloads
+        **kwargs
+            Keyword arguments of `open_google_sheet`
+
+        Returns
+        -------
+        dict
+            DataFrame of every token
+        """
+        tokens = list(tokens)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            frames = executor.map(
+                lambda token: PandasUtilities.open_google_sheet(token, **kwargs), tokens
+            )
+            return dict(zip(tokens, frames))
+
+
+for _name, _method in list(vars(PandasUtilities).items()):
+    if isinstance(_method, staticmethod) and not _name.startswith("_"):
+        setattr(PandasUtilities, _name, staticmethod(_profiled(_name, _method.__func__)))
+del _name, _method
@@ -3,12 +3,36 @@
 
 """Tests for `pandas_utility` package."""
 
+import gc
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
 import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.error import HTTPError
 
 import numpy as np
 import pandas as pd
+from pandas.api.types import is_datetime64_any_dtype
 
-from pandas_utility import PandasUtilities
+from pandas_utility import (
+    AggregationState,
+    CategoryFilter,
+    ColumnIndexCache,
+    CountMinSketch,
+    CsvCache,
+    DuplicateTracker,
+    HyperLogLog,
+    JoinIndex,
+    LazyFrame,
+    NullProfile,
+    NullProfileCache,
+    PandasUtilities,
+    Profiler,
+)
 
 
 class TestPandasUtilities(unittest.TestCase, PandasUtilities):
@@ -25,6 +49,63 @@ class TestPandasUtilities(unittest.TestCase, PandasUtilities):
         self.assertIn(self.column_names[0], self.df.columns)
         self.assertIsInstance(self.df.columns.values, np.ndarray)
 
+    def test_generate_random_df(self):
+        with self.assertRaises(ValueError):
+            self.create_random_df(2, 3, self.column_names)
+
+        df = self.create_random_df(100, 2, self.column_names, nan_fraction=0.5, seed=1)
+        self.assertEqual(list(df.columns), self.column_names)
+        self.assertTrue(df.isna().any().all())
+        pd.testing.assert_frame_equal(
+            df, self.create_random_df(100, 2, self.column_names, nan_fraction=0.5, seed=1)
+        )
+
+        schema = {
+            "id": {"dtype": "int", "low": 10, "high": 20},
+            "value": "float32",
+            "genre": {"dtype": "category", "cardinality": 5, "nan": 0.0},
+            "date": {"dtype": "datetime", "start": "2020-01-01", "end": "2020-02-01"},
+            "name": {"dtype": "string", "length": 4},
+        }
+        chunks = list(
+            self.generate_random_df(1000, schema, chunksize=300, nan_fraction=0.1, seed=7)
+        )
+        self.assertEqual([len(chunk) for chunk in chunks], [300, 300, 300, 100])
+        df = pd.concat(chunks)
+        pd.testing.assert_index_equal(df.index, pd.RangeIndex(1000))
+        self.assertEqual(str(df["id"].dtype), "Int64")
+        self.assertTrue(df["id"].dropna().between(10, 19).all())
+        self.assertEqual(df["value"].dtype, np.float32)
+        self.assertEqual(list(df["genre"].cat.categories), ["c0", "c1", "c2", "c3", "c4"])
+        self.assertFalse(df["genre"].isna().any())
+        # Zipf skew: the first category is the most frequent one.
+        self.assertEqual(df["genre"].value_counts().index[0], "c0")
+        self.assertTrue(df["date"].dropna().between("2020-01-01", "2020-02-01").all())
+        self.assertTrue(df["name"].dropna().str.fullmatch("[a-z]{4}").all())
+        self.assertTrue(df.drop(columns="genre").isna().mean().between(0.05, 0.15).all())
+
+        parallel = self.generate_random_df(
+            1000, schema, chunksize=300, nan_fraction=0.1, seed=7, max_workers=2
+        )
+        pd.testing.assert_frame_equal(pd.concat(parallel), df)
+        seed = np.random.SeedSequence(7)
+        for _ in range(2):
+            data = self.generate_random_df(
+                1000, schema, chunksize=300, nan_fraction=0.1, seed=seed
+            )
+            pd.testing.assert_frame_equal(pd.concat(data), df)
+        with self.assertRaises(ValueError):
+            next(self.generate_random_df(10, {"a": "complex"}))
+        with self.assertRaises(ValueError):
+            next(self.generate_random_df(10, {"a": {"dtype": "int", "length": 3}}))
+
+        path = os.path.join(tempfile.mkdtemp(), "random.csv")
+        self.addCleanup(shutil.rmtree, os.path.dirname(path))
+        self.write_random_df(path, 1000, schema, chunksize=300, nan_fraction=0.1, seed=7)
+        written = pd.read_csv(path)
+        self.assertEqual(written.shape, (1000, 5))
+        pd.testing.assert_series_equal(written["value"], df["value"].astype(float))
+
     def test_rename_cols(self):
         new_column_names = ["column 1", "column 2"]
         new_df = self.rename_cols(self.df, new_names=new_column_names)
@@ -33,6 +114,49 @@ class TestPandasUtilities(unittest.TestCase, PandasUtilities):
         self.assertNotIn(" ", new_df.columns)
         self.assertNotIn("-", new_df.columns)
 
+    def test_rename_cols_without_copies(self):
+        df = pd.DataFrame({"col A": [1.0, 2.0], "col B": ["x", "y"], 3: [1, 2]})
+        values = df["col A"].to_numpy()
+
+        renamed = self.rename_cols(df, prefix="p_", suffix="_s")
+        self.assertEqual(list(renamed.columns), ["p_col A_s", "p_col B_s", "p_3_s"])
+        self.assertEqual(list(df.columns), ["col A", "col B", 3])
+        self.assertTrue(np.shares_memory(renamed["p_col A_s"].to_numpy(), values))
+
+        copied = self.rename_cols(df, prefix="p_", copy=True)
+        self.assertFalse(np.shares_memory(copied["p_col A"].to_numpy(), values))
+
+        self.assertIsNone(
+            self.rename_cols(df, new_names=["a b", "c", 4], suffix="_s", inplace=True)
+        )
+        self.assertEqual(list(df.columns), ["a_b_s", "c_s", "4_s"])
+        self.assertTrue(np.shares_memory(df["a_b_s"].to_numpy(), values))
+
+    def test_reverse_without_copies(self):
+        df = pd.DataFrame({"a": [1.0, 2.0, 3.0], "b": [4, 5, 6]}, index=[7, 8, 9])
+        for reversed_df in (
+            self.reverse_row_order(df),
+            self.reverse_row_order(df, reset_index=True),
+            self.reverse_col_order(df),
+        ):
+            for column in df.columns:
+                self.assertTrue(
+                    np.shares_memory(
+                        reversed_df[column].to_numpy(), df[column].to_numpy()
+                    )
+                )
+        self.assertEqual(list(self.reverse_row_order(df).index), [9, 8, 7])
+        pd.testing.assert_index_equal(
+            self.reverse_row_order(df, reset_index=True).index, pd.RangeIndex(3)
+        )
+        self.assertEqual(list(self.reverse_col_order(df).columns), ["b", "a"])
+
+        copied = self.reverse_row_order(df, copy=True)
+        self.assertFalse(np.shares_memory(copied["a"].to_numpy(), df["a"].to_numpy()))
+        copied = self.reverse_col_order(df, copy=True)
+        self.assertFalse(np.shares_memory(copied["a"].to_numpy(), df["a"].to_numpy()))
+        pd.testing.assert_frame_equal(copied, df[["b", "a"]])
+
     def test_reverse_row_order(self):
         new_df = self.reverse_row_order(self.df)
         self.assertTrue(all(self.df.loc[0] == new_df.loc[0]))
@@ -81,32 +205,1091 @@ class TestPandasUtilities(unittest.TestCase, PandasUtilities):
             )
         )
 
+    def _write_csvs(self, n_files=3, rows=10):
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        csv_files = []
+        for i in range(n_files):
+            df = pd.DataFrame(
+                {
+                    "id": np.arange(rows) + i * rows,
+                    "value": np.random.rand(rows),
+                    "category": np.random.choice(["a", "b", "c"], rows),
+                }
+            )
+            csv_file = os.path.join(tmp_dir, "file_{}.csv".format(i))
+            df.to_csv(csv_file, index=False)
+            csv_files.append(csv_file)
+        return csv_files
+
+    def test_build_df_from_csvs_parallel(self):
+        csv_files = self._write_csvs()
+        expected = self.build_df_from_csvs(csv_files, axis=0)
+        for executor in ("thread", "process"):
+            data = self.build_df_from_csvs(
+                csv_files, axis=0, parallel=True, max_workers=2, executor=executor
+            )
+            pd.testing.assert_frame_equal(data, expected)
+        data = self.build_df_from_csvs(
+            csv_files,
+            axis=0,
+            parallel=True,
+            dtype={"id": "int32"},
+            usecols=[["id"], ["id", "value"], ["id"]],
+        )
+        self.assertEqual(data["id"].dtype, np.int32)
+        self.assertEqual(data["value"].notna().sum(), 10)
+        with self.assertRaises(ValueError):
+            self.build_df_from_csvs(csv_files, axis=0, parallel=True, executor="gpu")
+
+    def test_build_df_from_csvs_pushdown(self):
+        csv_files = self._write_csvs(rows=50)
+        full = self.build_df_from_csvs(csv_files, axis=0)
+        full.loc[::7, "value"] = np.nan
+        for csv_file, rows in zip(csv_files, np.array_split(np.arange(150), 3)):
+            full.iloc[rows].to_csv(csv_file, index=False)
+
+        filters = [
+            ("category", "isin", ["a", "b"]),
+            ("value", "notna"),
+            ("id", "between", (20, 120)),
+        ]
+        expected = full[
+            full["category"].isin(["a", "b"])
+            & full["value"].notna()
+            & full["id"].between(20, 120)
+        ]
+        for parallel in (False, True):
+            data = self.build_df_from_csvs(
+                csv_files,
+                axis=0,
+                parallel=parallel,
+                include_datatype=["number"],
+                filters=filters,
+                chunksize=8,
+            )
+            pd.testing.assert_frame_equal(
+                data, expected[["id", "value"]].reset_index(drop=True)
+            )
+
+        data = self.build_df_from_csvs(
+            csv_files,
+            axis=0,
+            usecols=["category"],
+            filters=[("category", "notin", ["a"]), ("id", "between", (0, 9))],
+        )
+        self.assertEqual(list(data.columns), ["category"])
+        self.assertEqual(
+            list(data["category"]),
+            list(full["category"].iloc[:10][lambda col: col != "a"]),
+        )
+        data = self.build_df_from_csvs(
+            csv_files,
+            axis=0,
+            exclude_datatype=["number"],
+            filters=[("id", "between", (0, -1))],
+        )
+        self.assertEqual(data.shape, (0, 1))
+
+        chunks = list(
+            self.stream_df_from_csvs(
+                csv_files, chunksize=20, usecols=["value"], filters=filters
+            )
+        )
+        self.assertEqual(sum(len(chunk) for chunk in chunks), len(expected))
+        self.assertEqual(list(chunks[0].columns), ["value"])
+
+        for bad_filter in (("value", "like", "%a"), ("value", "between"), ("value",)):
+            with self.assertRaises(ValueError):
+                self.build_df_from_csvs(csv_files, axis=0, filters=[bad_filter])
+
+    def test_infer_csv_schema(self):
+        csv_files = self._write_csvs(n_files=2)
+        frames = [
+            pd.DataFrame(
+                {
+                    "count": [1, 2, 3],
+                    "price": [1.5, 2.0, 3.0],
+                    "genre": ["Rock", "Jazz", "Rock"],
+                    "date": ["2020-01-01", "2020-01-02", "2020-01-03"],
+                    "flag": [True, False, True],
+                    "code": [1, 2, 3],
+                }
+            ),
+            pd.DataFrame(
+                {
+                    "count": [4, None, 6],
+                    "price": [4, 5, 6],
+                    "genre": ["Pop", "Pop", "Jazz"],
+                    "date": ["2021-01-01", None, "2021-01-03"],
+                    "flag": [True, None, False],
+                    "code": ["x", "y", "z"],
+                    "extra": [1, 2, 3],
+                }
+            ),
+        ]
+        for frame, csv_file in zip(frames, csv_files):
+            frame.to_csv(csv_file, index=False)
+
+        dtype, mismatches = self.infer_csv_schema(csv_files)
+        self.assertEqual(
+            dtype,
+            {
+                "count": "Int64",
+                "price": "float64",
+                "genre": "category",
+                "date": "datetime64[ns]",
+                "flag": "boolean",
+                "code": "str",
+                "extra": "Int64",
+            },
+        )
+        self.assertEqual(list(mismatches.index), ["code", "extra"])
+        self.assertEqual(list(mismatches.columns), csv_files)
+        self.assertEqual(list(mismatches.loc["code"]), ["int", "string"])
+        self.assertTrue(pd.isna(mismatches.loc["extra", csv_files[0]]))
+
+        with self.assertWarns(UserWarning):
+            data = self.build_df_from_csvs(csv_files, axis=0, dtype="infer")
+        self.assertEqual(str(data["count"].dtype), "Int64")
+        self.assertEqual(data["count"].isna().sum(), 1)
+        self.assertEqual(list(data["genre"].cat.categories), ["Jazz", "Rock", "Pop"])
+        self.assertTrue(is_datetime64_any_dtype(data["date"]))
+        self.assertEqual(str(data["flag"].dtype), "boolean")
+        self.assertEqual(list(data["code"]), ["1", "2", "3", "x", "y", "z"])
+        with self.assertRaises(ValueError):
+            self.build_df_from_csvs(csv_files, axis=0, dtype="infer", strict=True)
+
+        data = self.build_df_from_csvs(
+            csv_files, axis=0, dtype="infer", usecols=["count", "genre"], strict=True
+        )
+        self.assertEqual(list(data.dtypes.astype(str)), ["Int64", "category"])
+
+        # A file without the date column.
+        pd.DataFrame({"count": [7]}).to_csv(csv_files[1], index=False)
+        with self.assertWarns(UserWarning):
+            data = self.build_df_from_csvs(csv_files, axis=0, dtype="infer")
+        self.assertTrue(is_datetime64_any_dtype(data["date"]))
+        self.assertEqual(list(data["count"]), [1, 2, 3, 7])
+        self.assertTrue(pd.isna(data["date"].iloc[-1]))
+
+    def test_infer_csv_schema_past_sample(self):
+        csv_file = self._write_csvs(n_files=1)[0]
+        # NaN's and fractions after the 10000 sampled rows.
+        df = pd.DataFrame({"n": np.arange(20000.0), "v": np.arange(20000)})
+        df.loc[15000, "n"] = np.nan
+        df.to_csv(csv_file, index=False)
+        dtype, _ = self.infer_csv_schema([csv_file])
+        self.assertEqual(dtype, {"n": "float64", "v": "Int64"})
+        data = self.build_df_from_csvs([csv_file], axis=0, dtype="infer")
+        self.assertEqual(data["n"].isna().sum(), 1)
+        self.assertEqual(str(data["v"].dtype), "Int64")
+
+        # A fraction past the sample does not fit 'Int64'.
+        df["v"] = df["v"].astype(object)
+        df.loc[19999, "v"] = 2.5
+        df.to_csv(csv_file, index=False)
+        with self.assertWarns(UserWarning):
+            data = self.build_df_from_csvs([csv_file], axis=0, dtype="infer")
+        pd.testing.assert_frame_equal(data, pd.read_csv(csv_file))
+        with self.assertRaises(ValueError):
+            self.build_df_from_csvs([csv_file], axis=0, dtype="infer", strict=True)
+
+    def test_csv_cache(self):
+        csv_files = self._write_csvs()
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+        cache = CsvCache(cache_dir)
+        expected = self.build_df_from_csvs(csv_files, axis=0)
+        for _ in range(2):
+            data = self.build_df_from_csvs(csv_files, axis=0, cache=cache)
+            pd.testing.assert_frame_equal(data, expected)
+        self.assertEqual(len(os.listdir(cache_dir)), 3)
+
+        data = cache.read_csv(csv_files[0])
+        base = data["value"].to_numpy()
+        while not isinstance(base, np.memmap) and base.base is not None:
+            base = base.base
+        self.assertIsInstance(base, np.memmap)
+        data.loc[0, "value"] = -1.0
+        pd.testing.assert_frame_equal(
+            cache.read_csv(csv_files[0]), pd.read_csv(csv_files[0])
+        )
+
+        self.build_df_from_csvs(csv_files, axis=0, cache=cache, usecols=["id"])
+        self.assertEqual(len(os.listdir(cache_dir)), 6)
+        cache.invalidate(csv_files[0])
+        self.assertEqual(len(os.listdir(cache_dir)), 4)
+
+        pd.DataFrame({"id": [1, 2]}).to_csv(csv_files[1], index=False)
+        pd.testing.assert_frame_equal(
+            cache.read_csv(csv_files[1]), pd.DataFrame({"id": [1, 2]})
+        )
+        cache.max_bytes = cache.nbytes // 2
+        cache.read_csv(csv_files[2], usecols=["value"])
+        self.assertLessEqual(cache.nbytes, cache.max_bytes)
+        cache.invalidate()
+        self.assertEqual(os.listdir(cache_dir), [])
+
+    def _serve_sheets(self, sheets):
+        """Serve `sheets` ({token: csv text}) from a local HTTP server."""
+        responses = []
+
+        class SheetHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                token = self.path.strip("/").split(".")[0]
+                if token not in sheets:
+                    self.send_error(404)
+                    return
+                body = sheets[token].encode()
+                etag = '"{}"'.format(hashlib.sha1(body).hexdigest())
+                if self.headers.get("If-None-Match") == etag:
+                    responses.append(304)
+                    self.send_response(304)
+                    self.end_headers()
+                    return
+                responses.append(200)
+                self.send_response(200)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), SheetHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        base_url = "http://127.0.0.1:{}/{{}}.csv".format(server.server_address[1])
+        return base_url, responses
+
+    def test_open_google_sheet(self):
+        sheets = {
+            "sheet_{}".format(i): "id,value\n{},{}\n".format(i, i * 2) for i in range(5)
+        }
+        base_url, responses = self._serve_sheets(sheets)
+        data = self.open_google_sheet("sheet_1", base_url=base_url)
+        pd.testing.assert_frame_equal(data, pd.DataFrame({"id": [1], "value": [2]}))
+
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+        cache = CsvCache(cache_dir)
+        for expected_status in (200, 304):
+            del responses[:]
+            data = self.open_google_sheets(sheets, base_url=base_url, cache=cache)
+            self.assertEqual(list(data), list(sheets))
+            self.assertEqual(responses, [expected_status] * len(sheets))
+            self.assertEqual(list(data["sheet_3"]["value"]), [6])
+
+        sheets["sheet_3"] = "id,value\n3,7\n"
+        data = self.open_google_sheet("sheet_3", base_url=base_url, cache=cache)
+        self.assertEqual(list(data["value"]), [7])
+
+        # Downloads are part of the cache, its size and invalidation.
+        self.assertGreater(cache.nbytes, 0)
+        cache.invalidate(base_url.format("sheet_3"))
+        self.assertEqual(len(os.listdir(cache_dir)), 2 * len(sheets) - 2)
+        cache.max_bytes = 10
+        self.open_google_sheets(sheets, base_url=base_url, cache=cache)
+        self.assertLessEqual(cache.nbytes, cache.max_bytes)
+        cache.invalidate()
+        self.assertEqual(os.listdir(cache_dir), [])
+        with self.assertRaises(HTTPError):
+            self.open_google_sheet("missing", base_url=base_url, retries=0)
+
+    def test_stream_df_from_csvs(self):
+        csv_files = self._write_csvs(rows=10)
+        expected = self.build_df_from_csvs(csv_files, axis=0)
+        chunks = list(self.stream_df_from_csvs(csv_files, chunksize=4))
+        self.assertEqual([len(chunk) for chunk in chunks], [4, 4, 2] * 3)
+        pd.testing.assert_frame_equal(pd.concat(chunks), expected)
+        filtered = pd.concat(
+            self.filter_by_multiple_categories(chunk, "category", filter_by=["a"])
+            for chunk in self.stream_df_from_csvs(
+                csv_files, chunksize=4, usecols=["id", "category"]
+            )
+        )
+        pd.testing.assert_frame_equal(
+            filtered, expected.loc[expected["category"] == "a", ["id", "category"]]
+        )
+
+    def test_optimize_memory(self):
+        rows = 100
+        df = pd.DataFrame(
+            {
+                "small_int": np.arange(rows, dtype=np.int64),
+                "negative_int": -np.arange(rows, dtype=np.int64),
+                "float": np.arange(rows, dtype=np.float64) / 2,
+                "precise_float": np.random.rand(rows),
+                "category": np.random.choice(["a", "b", "c"], rows).astype(object),
+                "date": ["2019-08-{:02d}".format(i % 28 + 1) for i in range(rows)],
+            }
+        )
+        optimized, report, dtype_map = self.optimize_memory(df, date_format="%Y-%m-%d")
+        self.assertEqual(optimized["small_int"].dtype, np.uint8)
+        self.assertEqual(optimized["negative_int"].dtype, np.int8)
+        self.assertEqual(optimized["float"].dtype, np.float32)
+        self.assertEqual(optimized["precise_float"].dtype, np.float64)
+        self.assertIsInstance(optimized["category"].dtype, pd.CategoricalDtype)
+        self.assertTrue(pd.api.types.is_datetime64_any_dtype(optimized["date"]))
+        self.assertEqual(list(dtype_map), ["category", "date"])
+        self.assertEqual(dtype_map["category"], "category")
+        self.assertLess(report["after"].sum(), report["before"].sum())
+        pd.testing.assert_frame_equal(
+            optimized.astype({"small_int": np.int64, "float": np.float64}).drop(
+                columns=["negative_int", "category", "date"]
+            ),
+            df.drop(columns=["negative_int", "category", "date"]),
+        )
+
+        csv_file = self._write_csvs(n_files=1)[0]
+        _, _, dtype_map = self.optimize_memory(pd.read_csv(csv_file))
+        self.assertEqual(list(dtype_map), ["category"])
+        # A later file outside of the range of the first one is not wrapped around.
+        pd.DataFrame({"id": [1, 300, -5], "category": ["a", "b", "a"]}).to_csv(
+            csv_file, index=False
+        )
+        data = self.build_df_from_csvs([csv_file], axis=0, dtype=dtype_map)
+        self.assertEqual(list(data["id"]), [1, 300, -5])
+        self.assertIsInstance(data["category"].dtype, pd.CategoricalDtype)
+
+    def test_parallel_apply(self):
+        rows = 1000
+        df = pd.DataFrame(
+            {
+                "genre": np.random.choice(["Drama", "Crime", None], rows),
+                "stars": np.where(
+                    np.random.rand(rows) < 0.2, np.nan, np.random.rand(rows) * 10
+                ),
+                "date": np.random.choice(["2019-08-06", "2020-01-31"], rows),
+            },
+            index=np.arange(rows)[::-1],
+        )
+        calls = [
+            ("filter_by_multiple_categories", "genre", {"filter_by": ["Drama"]}),
+            ("remove_rows_with_nan", "stars", {}),
+            (
+                "continous_to_categorical_data",
+                "stars",
+                {"bins": [0, 5, 10], "labels": ["low", "high"]},
+            ),
+            ("col_to_datetime", "date", {}),
+            # Equal-width bins span the whole column, not every partition.
+            ("continous_to_categorical_data", "stars", {"bins": 4}),
+            (
+                "continous_to_categorical_data",
+                "stars",
+                {"bins": 2, "labels": ["low", "high"], "include_lowest": True},
+            ),
+            ("remove_rows_with_nan", ["genre", "stars"], {}),
+        ]
+        for operation, column_name, kwargs in calls:
+            expected = getattr(self, operation)(df, column_name, **kwargs)
+            data = self.parallel_apply(
+                df, operation, column_name, n_partitions=3, max_workers=2, **kwargs
+            )
+            if isinstance(expected, pd.DataFrame):
+                pd.testing.assert_frame_equal(data, expected)
+            else:
+                pd.testing.assert_series_equal(data, expected)
+
+        df.iloc[::7, 2] = "not a date"
+        expected, failed = self.col_to_datetime(df, "date", errors="coerce", report=True)
+        data, data_failed = self.parallel_apply(
+            df,
+            "col_to_datetime",
+            "date",
+            n_partitions=3,
+            max_workers=2,
+            errors="coerce",
+            report=True,
+        )
+        pd.testing.assert_series_equal(data, expected)
+        self.assertEqual((data_failed, failed), (len(df.iloc[::7]),) * 2)
+        with self.assertRaises(ValueError):
+            self.parallel_apply(df, "filter_by_large_categories", "genre")
+
     def test_split_df_into_subsets(self):
-        pass
+        df = self.create_random_df(100, 3)
+        df_1, df_2 = self.split_df_into_subsets(df, fraction=0.3)
+        pd.testing.assert_frame_equal(df_1, df.sample(frac=0.3, random_state=1234))
+        pd.testing.assert_frame_equal(df_2, df.drop(df_1.index))
+
+        df.index = [0] * 50 + [1] * 50
+        subsets = self.split_df_into_subsets(df, fraction=[0.5, 0.2, 0.2])
+        self.assertEqual([len(subset) for subset in subsets], [50, 20, 20, 10])
+        # Fractions that do not divide the rows evenly.
+        uneven = self.split_df_into_subsets(df.iloc[:10], fraction=[0.35, 0.35, 0.3])
+        self.assertEqual([len(subset) for subset in uneven], [4, 3, 3, 0])
+        labelled = df.iloc[:20].assign(label=["a"] * 10 + ["b"] * 10)
+        uneven = self.split_df_into_subsets(
+            labelled, fraction=[0.35, 0.35, 0.3], stratify="label"
+        )
+        self.assertEqual([len(subset) for subset in uneven], [8, 6, 6, 0])
+        pd.testing.assert_frame_equal(
+            pd.concat(subsets).sort_values(0), df.sort_values(0)
+        )
+
+        df["label"] = ["a"] * 80 + ["b"] * 10 + [None] * 10
+        positions = self.split_df_into_subsets(
+            df, fraction=[0.5, 0.3], stratify="label", return_indices=True
+        )
+        self.assertEqual(sorted(np.concatenate(positions)), list(range(100)))
+        counts = [df["label"].iloc[pos].value_counts(dropna=False) for pos in positions]
+        self.assertEqual(list(counts[0][["a", "b", None]]), [40, 5, 5])
+        self.assertEqual(list(counts[1][["a", "b", None]]), [24, 3, 3])
+        self.assertEqual(list(counts[2][["a", "b", None]]), [16, 2, 2])
+        with self.assertRaises(ValueError):
+            self.split_df_into_subsets(df, fraction=[0.8, 0.3])
 
     def test_filter_by_multiple_categories(self):
-        pass
+        df = pd.DataFrame(
+            {
+                "genre": ["Drama", "Crime", None, "Action", "Drama", "Comedy"],
+                "stars": [9.3, 9.2, 9.1, 9.0, 8.9, 8.9],
+                "votes": [5, 3, 8, 1, 3, 2],
+            }
+        )
+        filter_by = ["Drama", "Action", "Western"]
+        expected = df[df["genre"].isin(filter_by)]
+        data = self.filter_by_multiple_categories(df, "genre", filter_by=filter_by)
+        pd.testing.assert_frame_equal(data, expected)
+        lookup = CategoryFilter(filter_by)
+        for _ in range(2):
+            data = self.filter_by_multiple_categories(df, "genre", filter_by=lookup)
+            pd.testing.assert_frame_equal(data, expected)
+        data = self.filter_by_multiple_categories(
+            df, "genre", filter_by=lookup, exclude=True
+        )
+        pd.testing.assert_frame_equal(data, df[~df["genre"].isin(filter_by)])
+
+        categorical = df.astype({"genre": "category"})
+        for _filter_by in (filter_by, lookup, lookup):
+            data = self.filter_by_multiple_categories(
+                categorical, "genre", filter_by=_filter_by
+            )
+            self.assertEqual(list(data.index), list(expected.index))
+
+        lookup = CategoryFilter([3, 5, 7])
+        data = self.filter_by_multiple_categories(df, "votes", filter_by=lookup)
+        pd.testing.assert_frame_equal(data, df[df["votes"].isin([3, 5, 7])])
+        data = self.filter_by_multiple_categories(
+            df, "votes", filter_by=CategoryFilter([])
+        )
+        self.assertTrue(data.empty)
+
+        # isin equates True with 1 and False with 0.
+        flags = pd.DataFrame(
+            {
+                "int": pd.array([1, 0, 2], dtype="Int64"),
+                "bool": [True, False, True],
+                "object": pd.Series([1, "a", False], dtype=object),
+            }
+        )
+        for column in flags:
+            for categories in ([True], [1], [0, 2.0], [False, "a"]):
+                pd.testing.assert_frame_equal(
+                    self.filter_by_multiple_categories(
+                        flags, column, filter_by=CategoryFilter(categories)
+                    ),
+                    flags[flags[column].isin(categories)],
+                )
+
+    def test_build_column_index(self):
+        self.addCleanup(self.invalidate_column_index)
+        df = pd.DataFrame(
+            {
+                "genre": ["Drama", "Crime", None, "Action", "Drama", "Comedy"],
+                "stars": [9.3, 9.2, 9.1, 9.0, 8.9, np.nan],
+            }
+        )
+        filter_by = ["Drama", "Action", "Western"]
+        expected = self.filter_by_multiple_categories(df, "genre", filter_by=filter_by)
+        excluded = self.filter_by_multiple_categories(
+            df, "genre", filter_by=filter_by, exclude=True
+        )
+        expected_notna = self.remove_rows_with_nan(df, "stars")
+
+        index = self.build_column_index(df, "genre")
+        self.build_column_index(df, "stars")
+        self.assertIs(self.column_indexes.get(df, "genre"), index)
+        self.assertEqual(list(index.positions(filter_by)), [0, 3, 4])
+        self.assertEqual(list(index.positions([None])), [2])
+        self.assertEqual(list(index.nan_mask()), [0, 0, 1, 0, 0, 0])
+        pd.testing.assert_frame_equal(
+            self.filter_by_multiple_categories(df, "genre", filter_by=filter_by),
+            expected,
+        )
+        pd.testing.assert_frame_equal(
+            self.filter_by_multiple_categories(
+                df, "genre", filter_by=CategoryFilter(filter_by), exclude=True
+            ),
+            excluded,
+        )
+        pd.testing.assert_frame_equal(
+            self.remove_rows_with_nan(df, "stars"), expected_notna
+        )
+
+        self.invalidate_column_index(df, "genre")
+        self.assertIsNone(self.column_indexes.get(df, "genre"))
+        self.assertIsNotNone(self.column_indexes.get(df, "stars"))
+
+        cache = ColumnIndexCache(max_bytes=1)
+        cache.build(df, "genre")
+        cache.build(df, "stars")
+        self.assertEqual(len(cache), 1)
+        self.assertIsNone(cache.get(df, "genre"))
+        other = df.copy()
+        self.assertIsNone(cache.get(other, "stars"))
+
+        # Entries go away with their DataFrame.
+        cache = ColumnIndexCache()
+        cache.build(other, "genre")
+        profiles = NullProfileCache()
+        profiles.build(other)
+        del other
+        gc.collect()
+        self.assertEqual((len(cache), cache.nbytes), (0, 0))
+        self.assertEqual(len(profiles), 0)
 
     def test_filter_by_large_categories(self):
-        pass
+        df = pd.DataFrame(
+            {"genre": ["b", "a", "c", "a", None, "b", "d", None, None, "a", "c"]}
+        )
+        data = self.filter_by_large_categories(df, "genre", count=2)
+        self.assertEqual(list(data.index), [0, 1, 3, 5, 9])
+        # 'b' and 'c' tie, 'b' is seen first.
+        data, counts = self.filter_by_large_categories(
+            df, "genre", count=3, return_counts=True
+        )
+        self.assertEqual(list(counts.index), ["a", "b", "c"])
+        self.assertEqual(list(counts), [3, 2, 2])
+        self.assertEqual(len(data), 7)
+        data = self.filter_by_large_categories(df, "genre", count=10)
+        pd.testing.assert_frame_equal(data, df.dropna())
+        df["genre"] = df["genre"].astype("category")
+        data = self.filter_by_large_categories(df, "genre", count=1)
+        self.assertEqual(list(data.index), [1, 3, 9])
+
+    def test_sketch_categories(self):
+        rng = np.random.default_rng(0)
+        labels = np.array(["genre_{}".format(i) for i in range(2000)], dtype=object)
+        df = pd.DataFrame({"genre": labels[(rng.zipf(1.5, 50000) - 1) % len(labels)]})
+        df.loc[::100, "genre"] = None
+        chunks = [df.iloc[start:start + 5000] for start in range(0, len(df), 5000)]
+        counts, distinct = self.sketch_categories(iter(chunks), "genre", capacity=100)
+        self.assertIsInstance(counts, CountMinSketch)
+        self.assertIsInstance(distinct, HyperLogLog)
+
+        exact = df["genre"].value_counts()
+        top = counts.top(5)
+        self.assertEqual(list(top.index), list(exact.index[:5]))
+        self.assertTrue((top >= exact[:5]).all())
+        self.assertTrue((top <= exact[:5] + counts.error).all())
+        self.assertEqual(counts.total, exact.sum())
+        self.assertLess(abs(distinct.count() / df["genre"].nunique() - 1), 0.05)
+        self.assertLessEqual(counts.nbytes, 200000)
+
+        # Sketches of shards merge into the sketch of the whole stream.
+        left, left_distinct = self.sketch_categories(chunks[:4], "genre", capacity=100)
+        right, right_distinct = self.sketch_categories(chunks[4:], "genre", capacity=100)
+        left.merge(right)
+        np.testing.assert_array_equal(left.table, counts.table)
+        pd.testing.assert_series_equal(left.top(5), top)
+        self.assertEqual(left_distinct.merge(right_distinct).count(), distinct.count())
+
+        data, top = self.filter_by_large_categories(
+            chunks[-1], "genre", count=3, return_counts=True, sketch=counts
+        )
+        self.assertEqual(top.index.name, "genre")
+        pd.testing.assert_frame_equal(
+            data, chunks[-1][chunks[-1]["genre"].isin(exact.index[:3])]
+        )
+        self.assertEqual(counts.estimate(["genre_0"])["genre_0"], top["genre_0"])
+
+        with self.assertRaises(ValueError):
+            counts.top(101)
+        with self.assertRaises(ValueError):
+            counts.merge(CountMinSketch(epsilon=0.01))
+        with self.assertRaises(ValueError):
+            distinct.merge(HyperLogLog(error=0.1))
+
+    def test_drop_duplicate_rows(self):
+        df = pd.DataFrame(
+            {
+                "genre": ["Rock", "Pop", "Rock", None, "Pop", None, "Rock"],
+                "year": [2000, 2001, 2000, 2002, 2003, 2002, 2000],
+                "score": [1.0, 2.0, 3.0, np.nan, 2.0, np.nan, 1.0],
+            }
+        )
+        hashes = self.hash_rows(df)
+        self.assertEqual(hashes.dtype, np.uint64)
+        self.assertEqual(hashes[0], hashes[6])
+        self.assertNotEqual(hashes[0], hashes[2])
+        for subset in (None, ["genre", "year"], ["genre"]):
+            pd.testing.assert_frame_equal(
+                self.drop_duplicate_rows(df, subset), df.drop_duplicates(subset)
+            )
+
+        tracker = DuplicateTracker(["genre", "year"])
+        chunks = self.drop_duplicate_rows((df.iloc[:3], df.iloc[3:]), tracker=tracker)
+        data = pd.concat(chunks)
+        pd.testing.assert_frame_equal(data, df.drop_duplicates(["genre", "year"]))
+        self.assertEqual((tracker.rows, tracker.duplicates), (7, 3))
+        self.assertEqual(list(tracker.counts(data)), [3, 1, 2, 1])
+
+        class Colliding(DuplicateTracker):
+            # Four hashes for all rows, so most distinct rows collide.
+            def _hash(self, df):
+                data, hashes = super()._hash(df)
+                return data, hashes % np.uint64(4)
+
+        tracker = Colliding(verify=True)
+        data = pd.concat(tracker.drop_duplicates_chunks([df.iloc[:4], df.iloc[4:]]))
+        pd.testing.assert_frame_equal(data, df.drop_duplicates())
+        self.assertGreater(tracker.collisions, 0)
+        self.assertEqual(tracker.duplicates, 2)
+        self.assertLess(len(Colliding().drop_duplicates(df)), 5)
+
+        zeros = pd.DataFrame({"x": [0.0, -0.0, 1.0], "y": [-0.0, 0.0, 1.0]})
+        for verify in (False, True):
+            pd.testing.assert_frame_equal(
+                self.drop_duplicate_rows(zeros, verify=verify), zeros.drop_duplicates()
+            )
 
     def test_drop_cols_with_NaNs(self):
-        pass
+        df = pd.DataFrame(
+            {"a": [1.0, np.nan, np.nan, np.nan], "b": [1.0, 2.0, np.nan, 4.0], "c": 1}
+        )
+        self.assertEqual(list(self.drop_cols_with_NaNs(df, 0.5).columns), ["b", "c"])
+        self.assertEqual(list(self.drop_cols_with_NaNs(df, 0.1).columns), ["a", "b", "c"])
+
+        self.null_profile(df)
+        self.addCleanup(self.invalidate_null_profile)
+        for threshold in (0.1, 0.25, 0.5, 1.0):
+            pd.testing.assert_frame_equal(
+                self.drop_cols_with_NaNs(df, threshold),
+                df.dropna(thresh=len(df) * threshold, axis="columns"),
+            )
+
+    def test_null_profile(self):
+        df = pd.DataFrame(
+            {
+                "a": [1.0, np.nan, 3.0, np.nan, 5.0],
+                "b": ["x", None, "z", "w", None],
+                "c": pd.array([1, None, None, 4, 5], dtype="Int64"),
+            }
+        )
+        df = pd.concat([df] + [df.add_suffix("_{}".format(i)) for i in range(3)], axis=1)
+        profile = self.null_profile(df, block_rows=2)
+        self.addCleanup(self.invalidate_null_profile)
+        self.assertIsInstance(profile, NullProfile)
+        self.assertIs(self.null_profile(df), profile)
+        self.assertIs(self.null_profiles.get(df), profile)
+
+        np.testing.assert_array_equal(profile.null_counts, df.isna().sum().to_numpy())
+        np.testing.assert_array_equal(
+            profile.row_null_counts(), df.isna().sum(axis=1).to_numpy()
+        )
+        np.testing.assert_array_equal(
+            profile.row_null_counts(["a_2", "c"]), [0, 2, 1, 1, 0]
+        )
+        np.testing.assert_array_equal(
+            profile.null_rows(["a", "b"], how="all"), [False, True, False, False, False]
+        )
+        np.testing.assert_array_equal(
+            profile.null_rows(min_count=5), [False, True, False, False, False]
+        )
+        np.testing.assert_array_equal(
+            profile.null_rows(min_count=4), [False, True, True, True, True]
+        )
+        with self.assertRaises(KeyError):
+            profile.null_rows(["a", "missing"])
+        with self.assertRaises(ValueError):
+            profile.null_rows(how="some")
+
+        report = profile.report()
+        self.assertEqual(list(report.index), list(df.columns))
+        self.assertEqual(report.loc["b_1", "null_count"], 2)
+        self.assertAlmostEqual(report.loc["c", "null_fraction"], 0.4)
+
+        # A frame modified in place no longer matches its profile.
+        df["d"] = 1
+        self.assertIsNone(self.null_profiles.get(df))
+        self.assertEqual(len(self.null_profiles), 0)
 
     def test_aggregate_by_functions(self):
-        pass
+        orders = pd.DataFrame(
+            {
+                "order_id": [1, 1, 1, 1, 2, 3, 3, 5],
+                "quantity": [1, 1, 2, 1, 2, 1, 1, 4],
+                "item_price": [2.39, 3.39, np.nan, 2.39, 16.98, 10.98, 1.69, np.nan],
+            }
+        )
+        functions = ["sum", "count", "min", "max", "mean", "size"]
+        for presorted in (None, False):
+            data = self.aggregate_by_functions(
+                orders, "item_price", "order_id", functions, presorted=presorted
+            )
+            pd.testing.assert_frame_equal(
+                data, orders.groupby("order_id")["item_price"].agg(functions)
+            )
+            data = self.aggregate_by_functions(
+                orders, ["quantity", "item_price"], "order_id", functions
+            )
+            pd.testing.assert_frame_equal(
+                data,
+                orders.groupby("order_id")[["quantity", "item_price"]].agg(functions),
+            )
+
+        keys = pd.DataFrame({"key": [1, 1, 2, np.nan, np.nan], "value": 1.0})
+        pd.testing.assert_frame_equal(
+            self.aggregate_by_functions(keys, "value", "key", presorted=True),
+            keys.groupby("key")["value"].agg(["sum", "count"]),
+        )
+
+        shuffled = orders.iloc[[4, 0, 7, 1, 5, 2, 3, 6]]
+        data = self.aggregate_by_functions(shuffled, "item_price", "order_id")
+        self.assertEqual(list(data.index), [2, 1, 5, 3])
+        data = self.aggregate_by_functions(shuffled, "item_price", "order_id", sort=True)
+        self.assertEqual(list(data.index), [1, 2, 3, 5])
+        pd.testing.assert_frame_equal(
+            data, orders.groupby("order_id")["item_price"].agg(["sum", "count"])
+        )
+
+        data = self.aggregate_by_functions(
+            orders,
+            None,
+            "order_id",
+            {"total": ("item_price", "sum"), "items": ("quantity", "sum")},
+        )
+        self.assertEqual(list(data.columns), ["total", "items"])
+        self.assertEqual(list(data["items"]), [5, 2, 2, 4])
+
+        orders["order_id"] = orders["order_id"].astype(
+            pd.CategoricalDtype([1, 2, 3, 4, 5])
+        )
+        data = self.aggregate_by_functions(orders, "item_price", "order_id")
+        self.assertEqual(list(data.index), [1, 2, 3, 5])
+
+    def test_aggregation_state(self):
+        rng = np.random.RandomState(1234)
+        orders = pd.DataFrame(
+            {
+                "order_id": rng.randint(0, 20, 200),
+                "quantity": rng.randint(1, 5, 200),
+                "item_price": rng.rand(200) * 20,
+            }
+        )
+        orders.loc[rng.rand(200) < 0.1, "item_price"] = np.nan
+        functions = list(AggregationState.FUNCTIONS)
+        for column_name in ("item_price", "quantity"):
+            expected = self.aggregate_by_functions(
+                orders, column_name, "order_id", functions
+            )
+            chunks = np.array_split(np.arange(len(orders)), 5)
+            worker_1 = AggregationState(column_name, "order_id", functions)
+            worker_2 = AggregationState(column_name, "order_id", functions)
+            for chunk in chunks[:2]:
+                worker_1.update(orders.iloc[chunk])
+            for chunk in chunks[2:]:
+                worker_2.update(orders.iloc[chunk])
+            data = worker_1.merge(worker_2).finalize()
+            pd.testing.assert_frame_equal(data, expected)
+
+        state = AggregationState("item_price", "order_id")
+        pd.testing.assert_frame_equal(
+            state.update(orders).finalize(),
+            self.aggregate_by_functions(orders, "item_price", "order_id"),
+        )
+        with self.assertRaises(ValueError):
+            AggregationState("item_price", "order_id", ["median"])
+        with self.assertRaises(ValueError):
+            state.merge(AggregationState("quantity", "order_id"))
 
     def test_continous_to_categorical_data(self):
-        pass
+        ages = [22.0, 38.0, 26.0, 35.0, 35.0, np.nan, 54.0, 2.0, 0.0, 14.0, 120.0]
+        data = pd.DataFrame({"age": ages})
+        bins, labels = [0, 18, 25, 99], ["child", "young adult", "adult"]
+        pd.testing.assert_series_equal(
+            self.continous_to_categorical_data(data, "age", bins=bins, labels=labels),
+            pd.cut(data["age"], bins=bins, labels=labels),
+        )
+        pd.testing.assert_series_equal(
+            self.continous_to_categorical_data(
+                data, "age", bins=bins, include_lowest=True
+            ),
+            pd.cut(data["age"], bins=bins, include_lowest=True),
+        )
+        pd.testing.assert_series_equal(
+            self.continous_to_categorical_data(data, "age", bins=3),
+            pd.cut(data["age"], bins=3),
+        )
+        with self.assertRaises(ValueError):
+            self.continous_to_categorical_data(data, "age", bins=[0, 18, 18, 99])
+
+        data = pd.DataFrame({"age": [22, 38, 2, 0, 14, 120]})
+        for include_lowest in (False, True):
+            pd.testing.assert_series_equal(
+                self.continous_to_categorical_data(
+                    data, "age", bins=bins, include_lowest=include_lowest
+                ),
+                pd.cut(data["age"], bins=bins, include_lowest=include_lowest),
+            )
+
+        dates = pd.DataFrame({"date": pd.to_datetime(["2019-08-06", "2020-01-31"])})
+        bins = pd.to_datetime(["2019-01-01", "2020-01-01", "2021-01-01"])
+        pd.testing.assert_series_equal(
+            self.continous_to_categorical_data(dates, "date", bins=bins),
+            pd.cut(dates["date"], bins=bins),
+        )
+
+    def test_fit_quantile_bins(self):
+        batches = [
+            pd.DataFrame({"price": np.random.RandomState(seed).rand(100) * 10})
+            for seed in range(3)
+        ]
+        bins = self.fit_quantile_bins(batches[0], "price", q=4)
+        self.assertEqual(len(bins), 5)
+        data = self.continous_to_categorical_data(
+            batches[0], "price", bins=bins, include_lowest=True
+        )
+        self.assertEqual(list(data.value_counts(sort=False)), [25, 25, 25, 25])
+        for batch in batches[1:]:
+            pd.testing.assert_series_equal(
+                self.continous_to_categorical_data(
+                    batch, "price", bins=bins, labels=list("abcd"), include_lowest=True
+                ),
+                pd.cut(
+                    batch["price"], bins, labels=list("abcd"), include_lowest=True
+                ),
+            )
 
     def test_change_display_opt(self):
         pass
 
     def test_remove_rows_with_nan(self):
-        pass
+        df = pd.DataFrame(
+            {
+                "a": [1.0, np.nan, 3.0, np.nan],
+                "b": ["x", None, "z", "w"],
+                "c": [np.nan, np.nan, 3.0, 4.0],
+            }
+        )
+        expected = {
+            ("a", "any", None): [0, 2],
+            (("a", "b"), "any", None): [0, 2],
+            (("a", "b"), "all", None): [0, 2, 3],
+            (("a", "b", "c"), "all", None): [0, 2, 3],
+            (("a", "b", "c"), "any", 2): [0, 2, 3],
+        }
+        for use_profile in (False, True):
+            if use_profile:
+                self.null_profile(df)
+                self.addCleanup(self.invalidate_null_profile)
+            for (columns, how, min_count), rows in expected.items():
+                if isinstance(columns, tuple):
+                    columns = list(columns)
+                pd.testing.assert_frame_equal(
+                    self.remove_rows_with_nan(df, columns, how=how, min_count=min_count),
+                    df.iloc[rows],
+                )
+        with self.assertRaises(ValueError):
+            self.remove_rows_with_nan(df, ["a", "b"], how="some")
 
     def test_col_to_datetime(self):
-        pass
+        dates = ["2019-08-06", "2020-02-29", None, "2019-08-06", "2019-8-7", "1969-12-31"]
+        df = pd.DataFrame({"date": dates}, index=list("abcdef"))
+        data = self.col_to_datetime(df, "date")
+        pd.testing.assert_series_equal(
+            data, pd.to_datetime(df["date"], format="%Y-%m-%d")
+        )
+
+        df["date"] = dates[:-1] + ["2019-02-30"]
+        with self.assertRaises(ValueError):
+            self.col_to_datetime(df, "date")
+        data, failed = self.col_to_datetime(df, "date", errors="coerce", report=True)
+        pd.testing.assert_series_equal(
+            data, pd.to_datetime(df["date"], format="%Y-%m-%d", errors="coerce")
+        )
+        self.assertEqual(failed, 1)
+
+        for date_format in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%dT%H:%M:%S", "%d/%m/%Y %H"):
+            timestamps = pd.Series(
+                pd.to_datetime(["2019-08-06 23:59:59", "2000-01-01 00:00:00"] * 3)
+            ).dt.strftime(date_format)
+            df = pd.DataFrame({"timestamp": list(timestamps) + ["2019-08-06 24:00:00"]})
+            data, failed = self.col_to_datetime(
+                df, "timestamp", date_format=date_format, errors="coerce", report=True
+            )
+            pd.testing.assert_series_equal(
+                data,
+                pd.to_datetime(df["timestamp"], format=date_format, errors="coerce"),
+            )
+            self.assertEqual(failed, 1)
 
     def test_binning_column_by_group_names(self):
-        pass
+        df = pd.DataFrame({"price": np.random.rand(100) * 1000})
+        df.loc[[3, 7], "price"] = np.nan
+        data = self.binning_column_by_group_names(df, "price", 4)
+        values = df["price"]
+        bins = np.linspace(values.min(), values.max(), 4)
+        pd.testing.assert_series_equal(
+            data,
+            pd.cut(values, bins, labels=["Low", "Medium", "High"], include_lowest=True),
+        )
+        self.assertEqual(data.isna().sum(), 2)
+        labels = list(range(100))
+        pd.testing.assert_series_equal(
+            self.binning_column_by_group_names(df, "price", 101, group_names=labels),
+            pd.cut(
+                values,
+                np.linspace(values.min(), values.max(), 101),
+                labels=labels,
+                include_lowest=True,
+            ),
+        )
+
+    def test_profiler(self):
+        df = self.create_random_df(100, 2, ["a", "b"])
+        df.loc[::4, "a"] = np.nan
+        self.assertIsNone(self.remove_rows_with_nan.__globals__["_PROFILER"])
+
+        with Profiler(memory=True) as profiler:
+            self.remove_rows_with_nan(df, "a")
+            self.remove_rows_with_nan(df, "a")
+            self.reverse_row_order(df)
+            chunks = list(self.generate_random_df(10, {"x": "int"}, chunksize=4))
+            with Profiler() as inner:
+                self.reverse_col_order(df)
+        self.reverse_col_order(df)
+        self.assertEqual(len(chunks), 3)
+
+        stats = profiler.stats()
+        self.assertEqual(
+            set(stats),
+            {"remove_rows_with_nan", "reverse_row_order", "generate_random_df"},
+        )
+        self.assertEqual(list(inner.stats()), ["reverse_col_order"])
+        self.assertEqual(inner.stats()["reverse_col_order"]["calls"], 1)
+
+        removed = stats["remove_rows_with_nan"]
+        self.assertEqual(removed["calls"], 2)
+        self.assertEqual((removed["rows_in"], removed["rows_out"]), (200, 150))
+        self.assertEqual((removed["max_columns_in"], removed["max_columns_out"]), (2, 2))
+        self.assertGreater(removed["wall_time"], 0)
+        self.assertGreaterEqual(removed["wall_time"], removed["max_wall_time"])
+        self.assertGreater(removed["peak_memory"], 0)
+        self.assertEqual(removed["copies"], 2)
+        self.assertEqual(stats["reverse_row_order"]["views"], 1)
+        self.assertEqual(stats["generate_random_df"]["calls"], 1)
+        self.assertEqual(stats["generate_random_df"]["rows_out"], 10)
+
+        self.assertEqual(json.loads(profiler.to_json()), stats)
+        profiler.reset()
+        self.assertEqual(profiler.stats(), {})
+
+    def test_lazy(self):
+        df = pd.DataFrame(
+            {
+                "price": [1.0, np.nan, 3.0, 4.0, np.nan, 6.0],
+                "units": [1, 2, 3, 4, 5, 6],
+                "genre": ["Rock", "Jazz", "Pop", "Rock", "Jazz", "Jazz"],
+            },
+            index=list("abcdef"),
+        )
+        lazy = self.lazy(df)
+        self.assertIsInstance(lazy, LazyFrame)
+        pipeline = (
+            lazy.remove_rows_with_nan("price")
+            .filter_by_multiple_categories("genre", ["Rock", "Jazz"])
+            .select_by_datatype(include_datatype=["number"])
+            .rename_cols(prefix="sales_")
+        )
+        expected = self.remove_rows_with_nan(df, "price")
+        expected = self.filter_by_multiple_categories(expected, "genre", ["Rock", "Jazz"])
+        expected = self.select_by_datatype(expected, include_datatype=["number"])
+        expected = self.rename_cols(expected, prefix="sales_")
+        pd.testing.assert_frame_equal(pipeline.collect(), expected)
+        self.assertEqual(list(pipeline.columns), ["sales_price", "sales_units"])
+        self.assertIn("filter: notna_mask('price', 'any', None)", pipeline.explain())
+
+        # Every step returns a new plan, columns are named as at that step.
+        renamed = lazy.rename_cols(new_names=["unit price", "units", "music genre"])
+        filtered = renamed.filter_by_multiple_categories(
+            "music_genre", ["Jazz"], exclude=True
+        )
+        self.assertEqual(list(df.columns), ["price", "units", "genre"])
+        pd.testing.assert_frame_equal(
+            filtered.collect(),
+            df.iloc[[0, 2, 3]].set_axis(["unit_price", "units", "music_genre"], axis=1),
+        )
+        with self.assertRaises(KeyError):
+            renamed.remove_rows_with_nan("price")
+        with self.assertRaises(KeyError):
+            lazy.select_by_datatype(exclude_datatype=["number"]).remove_rows_with_nan(
+                "price"
+            )
+
+        collected = lazy.collect()
+        pd.testing.assert_frame_equal(collected, df)
+        self.assertTrue(np.shares_memory(collected["units"], df["units"]))
+
+    def test_join_by_index(self):
+        reference = pd.DataFrame(
+            {
+                "genre_id": [30, 10, 20],
+                "genre": ["Jazz", "Rock", "Pop"],
+                "rank": [3, 1, 2],
+                "score": [0.5, 0.1, 0.2],
+            }
+        )
+        facts = pd.DataFrame(
+            {"genre_id": [10, 40, 30, 10, 20], "score": [1.0, 2.0, 3.0, 4.0, 5.0]},
+            index=list("abcde"),
+        )
+        for method in ("hash", "sorted"):
+            join_index = self.build_join_index(reference, "genre_id", method=method)
+            self.assertIsInstance(join_index, JoinIndex)
+            np.testing.assert_array_equal(join_index.positions(facts), [1, -1, 0, 1, 2])
+            for how in ("left", "inner"):
+                expected = facts.reset_index().merge(
+                    reference, on="genre_id", how=how, validate="many_to_one"
+                )
+                data = self.join_by_index(facts, join_index, how=how)
+                pd.testing.assert_frame_equal(data.reset_index(), expected)
+            self.assertEqual(list(data.index), ["a", "c", "d", "e"])
+
+        join_index = self.build_join_index(reference, "genre_id", columns=["genre"])
+        renamed = facts.rename(columns={"genre_id": "id"})
+        chunks = self.join_by_index(
+            (renamed.iloc[:2], renamed.iloc[2:]), join_index, on="id", how="inner"
+        )
+        pd.testing.assert_frame_equal(
+            pd.concat(chunks),
+            renamed.drop("b").assign(genre=["Rock", "Jazz", "Rock", "Pop"]),
+        )
+
+        reference["year"] = [2001, 2000, 2000]
+        facts["year"] = [2000, 2000, 2001, 2001, 2000]
+        join_index = self.build_join_index(reference, ["genre_id", "year"], ["genre"])
+        self.assertEqual(
+            list(self.join_by_index(facts, join_index)["genre"].fillna("-")),
+            ["Rock", "-", "Jazz", "-", "Pop"],
+        )
+
+        with self.assertRaises(ValueError):
+            self.build_join_index(reference, "year")
+        with self.assertRaises(ValueError):
+            self.build_join_index(reference, "genre", method="sorted")
+        join_index = self.build_join_index(reference, "genre_id")
+        with self.assertRaises(ValueError):
+            self.join_by_index(facts, join_index, how="outer")
+
+        empty = reference.iloc[:0]
+        for method in ("hash", "sorted"):
+            join_index = self.build_join_index(empty, "genre_id", method=method)
+            np.testing.assert_array_equal(join_index.positions(facts), [-1] * 5)
+            self.assertEqual(len(self.join_by_index(facts, join_index, how="inner")), 0)